@@ -0,0 +1,71 @@
+import argparse
+import sys
+import time
+
+from dcrx.layers import Copy, Run
+from dcrx.layers.mount_types import CacheMount
+from dcrx.layers.trusted import construct, construct_layer
+
+
+def timed(name: str, count: int, build):
+    start = time.perf_counter()
+    layers = build()
+    elapsed = time.perf_counter() - start
+
+    assert len(layers) == count
+
+    sys.stdout.write(
+        f" - {name:<28} {elapsed:>8.3f}s ({count / elapsed:>12.0f} layers/s)\n"
+    )
+
+    return elapsed, layers
+
+
+def run(count: int):
+    mount = CacheMount(target="/root/.cache", sharing="locked")
+
+    run_fields = [
+        {"command": f"pip install package-{idx}", "mount": mount}
+        for idx in range(count // 2)
+    ]
+    copy_fields = [
+        {"source": f"src/file-{idx}.py", "destination": "/app", "user_id": "1000"}
+        for idx in range(count - len(run_fields))
+    ]
+
+    sys.stdout.write(f"Constructing {count} layers\n")
+
+    validated_time, validated = timed(
+        "validated (Model(**data))",
+        count,
+        lambda: [Run(**fields) for fields in run_fields]
+        + [Copy(**fields) for fields in copy_fields],
+    )
+
+    trusted_time, trusted = timed(
+        "trusted (construct)",
+        count,
+        lambda: [construct(Run, fields) for fields in run_fields]
+        + [construct(Copy, fields) for fields in copy_fields],
+    )
+
+    dumped = [layer.model_dump() for layer in validated]
+    timed(
+        "trusted (construct_layer)",
+        count,
+        lambda: [construct_layer(data) for data in dumped],
+    )
+
+    assert trusted == validated, "trusted construction diverged from validation"
+
+    sys.stdout.write(f"Trusted speedup: {validated_time / trusted_time:.2f}x\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare validated and trusted construction of layers."
+    )
+    parser.add_argument("--layers", type=int, default=1_000_000)
+
+    args = parser.parse_args()
+    run(args.layers)
@@ -0,0 +1,112 @@
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from dcrx import Image
+from dcrx.memory_file import MemoryFile
+
+BACKENDS = ["memory", "spooled", "memfd"]
+
+
+def send(context, sink_fd: int) -> int:
+    size = context.seek(0, os.SEEK_END)
+    sent = 0
+
+    # MemoryFile has no real descriptor, so its buffer is written from
+    # Python; everything else goes through sendfile.
+    if isinstance(context, MemoryFile):
+        buffer = context.getbuffer()
+        while sent < size:
+            sent += os.write(sink_fd, buffer[sent:])
+
+        return sent
+
+    while sent < size:
+        sent += os.sendfile(sink_fd, context.fileno(), sent, size - sent)
+
+    return sent
+
+
+def run_backend(backend: str, source: str):
+    image = Image(
+        "benchmark",
+        filename=os.path.join(os.path.dirname(source), "Dockerfile"),
+    )
+    image.stage("python", "3.11-slim")
+    image.files.append(source)
+
+    start = time.perf_counter()
+    context = image.to_context(backend=backend)
+    build_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with tempfile.TemporaryFile(dir=os.path.dirname(source)) as sink:
+        size = send(context, sink.fileno())
+    send_elapsed = time.perf_counter() - start
+
+    json.dump(
+        {
+            "type": type(context).__name__,
+            "size": size,
+            "build": build_elapsed,
+            "send": send_elapsed,
+            "rss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+        },
+        sys.stdout,
+    )
+
+
+def run(size: int):
+    with tempfile.TemporaryDirectory() as directory:
+        source = os.path.join(directory, "artifact.bin")
+
+        with open(source, "wb") as artifact:
+            chunk = os.urandom(1024 * 1024)
+            for _ in range(size // len(chunk)):
+                artifact.write(chunk)
+
+        sys.stdout.write(f"Building {size / 2**30:.2f} GiB contexts\n")
+
+        for backend in BACKENDS:
+            # Each backend runs in a fresh process so peak RSS is not
+            # polluted by earlier runs.
+            result = subprocess.run(
+                [sys.executable, __file__, "--backend", backend, "--source", source],
+                check=True,
+                capture_output=True,
+                text=True,
+            )
+            stats = json.loads(result.stdout)
+
+            sys.stdout.write(
+                f" - {backend:<8} ({stats['type']:<17}) "
+                f"build {stats['size'] / stats['build'] / 2**20:>8.0f} MiB/s  "
+                f"send {stats['size'] / stats['send'] / 2**20:>8.0f} MiB/s  "
+                f"peak RSS {stats['rss'] / 2**20:>8.0f} MiB\n"
+            )
+
+        sys.stdout.write(
+            "memfd pages are accounted as shared memory rather than process RSS.\n"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare throughput and peak RSS of to_context() backends."
+    )
+    parser.add_argument("--size", type=int, default=2 * 1024**3)
+    parser.add_argument("--backend", choices=BACKENDS)
+    parser.add_argument("--source")
+
+    args = parser.parse_args()
+
+    if args.backend:
+        run_backend(args.backend, args.source)
+
+    else:
+        run(args.size)
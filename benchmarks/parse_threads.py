@@ -0,0 +1,81 @@
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from dcrx.directive import Directives
+
+DOCKERFILE_TEMPLATE = """
+# syntax=docker/dockerfile:1
+ARG PYTHON_VERSION=3.{idx}
+ARG APP_FILE=app_{idx}.py
+FROM python:${{PYTHON_VERSION}}-slim AS build
+
+RUN apt-get update -y && \\
+    apt-get install -y build-essential && \\
+    echo "ENV and COPY inside a RUN body"
+RUN --mount=type=cache,target=/root/.cache pip install -r requirements.txt
+ENV APP_HOME=/src APP_ID={idx}
+COPY --chown=1000:1000 ${{APP_FILE}} /src
+LABEL build={idx}
+WORKDIR /src
+EXPOSE 8000
+USER app:app
+CMD ["python", "${{APP_FILE}}"]
+"""
+
+
+def parse_all(directives: Directives, dockerfiles: list[str]):
+    return [directives.parse(dockerfile) for dockerfile in dockerfiles]
+
+
+def run(files: int, max_threads: int):
+    dockerfiles = [DOCKERFILE_TEMPLATE.format(idx=idx) for idx in range(files)]
+
+    # A single shared parser instance is used by every thread.
+    directives = Directives()
+    expected = parse_all(directives, dockerfiles)
+
+    gil_enabled = getattr(sys, "_is_gil_enabled", lambda: True)()
+    sys.stdout.write(
+        f"Python {sys.version.split()[0]} - GIL enabled: {gil_enabled} - "
+        f"{files} Dockerfiles\n"
+    )
+
+    baseline: float | None = None
+    threads = 1
+
+    while threads <= max_threads:
+        chunks = [dockerfiles[idx::threads] for idx in range(threads)]
+
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            start = time.perf_counter()
+            results = list(
+                executor.map(lambda chunk: parse_all(directives, chunk), chunks)
+            )
+            elapsed = time.perf_counter() - start
+
+        for idx, chunk_results in enumerate(results):
+            assert chunk_results == expected[idx::threads], "parse results diverged"
+
+        if baseline is None:
+            baseline = elapsed
+
+        sys.stdout.write(
+            f" - {threads:>3} threads: {files / elapsed:>10.0f} files/s "
+            f"(speedup {baseline / elapsed:.2f}x)\n"
+        )
+
+        threads *= 2
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Parse Dockerfiles concurrently with one shared Directives instance."
+    )
+    parser.add_argument("--files", type=int, default=20000)
+    parser.add_argument("--threads", type=int, default=os.cpu_count() or 1)
+
+    args = parser.parse_args()
+    run(args.files, args.threads)
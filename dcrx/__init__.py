@@ -1,4 +1,6 @@
+from .cache import ParseCache
 from .image import Image
+from .resolved_image import ResolvedImage
 from .layers import (
     Add,
     Arg,
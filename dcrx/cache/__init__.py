@@ -0,0 +1,4 @@
+from .context_cache import ContextCache as ContextCache
+from .directory_cache import DirectoryCache as DirectoryCache
+from .file_hasher import FileHasher as FileHasher
+from .parse_cache import ParseCache as ParseCache
@@ -0,0 +1,129 @@
+import hashlib
+import os
+import stat
+from typing import BinaryIO, Callable, Iterable, Optional, Tuple
+
+from .directory_cache import DirectoryCache
+from .file_hasher import FileHasher
+from .util import get_dcrx_version, get_default_cache_directory
+
+# Bump whenever the context tar layout changes in a way the package
+# version alone would not capture.
+CONTEXT_CACHE_FORMAT = 4
+
+
+class ContextCache:
+    """
+    Opt-in on-disk cache of reproducible build context tarballs and their
+    digests, keyed by the rendered Dockerfile and a manifest of every
+    context file's path, executable bit, and content digest. Digests come
+    from a FileHasher, whose stat cache means unchanged inputs are served
+    from the cache without reading or re-tarring any file.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        max_size: int = 2 * 1024 * 1024 * 1024,
+        hasher: Optional[FileHasher] = None,
+    ) -> None:
+        if directory is None:
+            directory = get_default_cache_directory("context")
+
+        if hasher is None:
+            hasher = FileHasher(cache_path=os.path.join(directory, ".stats.json"))
+
+        self.directory = directory
+        self.hasher = hasher
+        self.version = f"{get_dcrx_version()}:{CONTEXT_CACHE_FORMAT}"
+
+        self._entries = DirectoryCache(directory, max_size)
+
+    @property
+    def max_size(self) -> int:
+        return self._entries.max_size
+
+    def key(
+        self,
+        dockerfile: str,
+        files: Iterable[Tuple[str, str]],
+        dockerfile_name: str = "Dockerfile",
+        deduplicate: bool = True,
+    ) -> str:
+        """
+        Returns the cache key for a rendered Dockerfile, stored in the tar
+        as ``dockerfile_name``, and its ``(path, arcname)`` context files.
+        ``deduplicate`` is keyed since it decides whether repeated content
+        is stored as hardlinks.
+        """
+        files = list(files)
+        digests = self.hasher.hash_files([path for path, _ in files])
+
+        context_hash = hashlib.blake2b(self.version.encode(), digest_size=20)
+        context_hash.update(b"\0")
+        context_hash.update(os.getenv("SOURCE_DATE_EPOCH", "0").encode())
+        context_hash.update(b"\0")
+        context_hash.update(dockerfile_name.encode())
+        context_hash.update(b"\0")
+        context_hash.update(f"{deduplicate:d}".encode())
+        context_hash.update(b"\0")
+        context_hash.update(dockerfile.encode())
+
+        for path, arcname in files:
+            file_mode = os.lstat(path).st_mode
+
+            # Reproducible contexts only keep the file type and whether
+            # it is executable, so nothing else of the mode is keyed.
+            executable = bool(file_mode & (stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH))
+
+            context_hash.update(b"\0")
+            context_hash.update(
+                f"{arcname}:{stat.S_IFMT(file_mode)}:{executable:d}:"
+                f"{digests[path]}".encode()
+            )
+
+        return context_hash.hexdigest()
+
+    def contains(self, key: str) -> bool:
+        return os.path.exists(self._entries.path(f"{key}.tar")) and os.path.exists(
+            self._entries.path(f"{key}.digest")
+        )
+
+    def open(self, key: str) -> Optional[Tuple[BinaryIO, str]]:
+        """
+        Returns the cached context tar, opened for reading, and its
+        digest, or None on a miss.
+        """
+        if (digest := self._entries.get(f"{key}.digest")) is None:
+            return None
+
+        if (context := self._entries.open(f"{key}.tar")) is None:
+            return None
+
+        return context, digest.decode()
+
+    def store(
+        self,
+        key: str,
+        build: Callable[[BinaryIO], str],
+    ) -> Tuple[BinaryIO, str]:
+        """
+        Streams a context into the cache with ``build``, which writes the
+        tar and returns its digest, then returns it as ``open()`` would.
+        Contexts too large for the cache are returned without being kept.
+        """
+        digest = ""
+
+        def write(context: BinaryIO):
+            nonlocal digest
+            digest = build(context)
+
+        context = self._entries.put_stream(f"{key}.tar", write)
+
+        if os.path.exists(self._entries.path(f"{key}.tar")):
+            self._entries.put(f"{key}.digest", digest.encode())
+
+        return context, digest
+
+    def clear(self):
+        self._entries.clear()
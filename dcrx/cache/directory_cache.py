@@ -0,0 +1,152 @@
+import os
+import tempfile
+import threading
+from typing import Any, BinaryIO, Callable, Optional
+
+
+class DirectoryCache:
+    """
+    A size-bounded key/value store kept as one file per entry in a
+    directory. Reads bump an entry's mtime so eviction drops the least
+    recently used entries first, and writes go through a temp file and
+    rename so concurrent processes never observe partial entries.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_size: int,
+    ) -> None:
+        self.directory = directory
+        self.max_size = max_size
+
+        self._size: Optional[int] = None
+        self._lock = threading.Lock()
+
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key)
+
+    def get(self, key: str) -> Optional[bytes]:
+        entry_path = self.path(key)
+
+        try:
+            with open(entry_path, "rb") as entry:
+                data = entry.read()
+
+            os.utime(entry_path)
+
+        except FileNotFoundError:
+            return None
+
+        return data
+
+    def open(self, key: str) -> Optional[BinaryIO]:
+        entry_path = self.path(key)
+
+        try:
+            entry = open(entry_path, "rb")
+
+        except FileNotFoundError:
+            return None
+
+        os.utime(entry_path)
+
+        return entry
+
+    def put(self, key: str, data: bytes):
+        self.put_stream(key, lambda entry: entry.write(data)).close()
+
+    def put_stream(self, key: str, write: Callable[[BinaryIO], Any]) -> BinaryIO:
+        """
+        Stores an entry by handing ``write`` an open temp file, so large
+        entries never need to be held in memory. Returns the entry opened
+        for reading from its start, which stays readable even if it is
+        evicted. Entries too large to survive eviction are returned
+        without being stored.
+        """
+        entry_fd, entry_tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".")
+        entry = os.fdopen(entry_fd, "w+b")
+
+        try:
+            write(entry)
+            entry.flush()
+            size = entry.tell()
+
+            stored = size <= self._target_size
+            if stored:
+                os.replace(entry_tmp_path, self.path(key))
+
+            else:
+                os.remove(entry_tmp_path)
+
+        except Exception:
+            entry.close()
+
+            if os.path.exists(entry_tmp_path):
+                os.remove(entry_tmp_path)
+
+            raise
+
+        entry.seek(0)
+
+        if stored:
+            with self._lock:
+                if self._size is None:
+                    self._size = self._scan_size()
+
+                else:
+                    self._size += size
+
+                if self._size > self.max_size:
+                    self._evict()
+
+        return entry
+
+    def clear(self):
+        with self._lock:
+            for entry in os.scandir(self.directory):
+                if entry.is_file():
+                    os.remove(entry.path)
+
+            self._size = 0
+
+    @property
+    def _target_size(self) -> int:
+        # Eviction trims to 90% of the limit so a full cache does not
+        # rescan the directory on every subsequent write.
+        return int(self.max_size * 0.9)
+
+    def _scan_size(self) -> int:
+        return sum(
+            entry.stat().st_size
+            for entry in os.scandir(self.directory)
+            if entry.is_file() and not entry.name.startswith(".")
+        )
+
+    def _evict(self):
+        entries = sorted(
+            (
+                (entry.stat().st_mtime_ns, entry.stat().st_size, entry.path)
+                for entry in os.scandir(self.directory)
+                if entry.is_file() and not entry.name.startswith(".")
+            ),
+        )
+
+        target_size = self._target_size
+        size = sum(entry_size for _, entry_size, _ in entries)
+
+        for _, entry_size, entry_path in entries:
+            if size <= target_size:
+                break
+
+            try:
+                os.remove(entry_path)
+
+            except FileNotFoundError:
+                pass
+
+            size -= entry_size
+
+        self._size = size
@@ -0,0 +1,143 @@
+import hashlib
+import json
+import os
+import stat
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional
+
+from ..writers import AtomicWriter
+
+from .util import get_default_cache_directory, is_settled
+
+# Bump whenever the digest scheme changes so stale entries are dropped.
+FILE_HASHER_FORMAT = 1
+
+
+class FileHasher:
+    """
+    Hashes files with BLAKE2 in chunked reads on a thread pool, keeping a
+    persistent ``(device, inode, size, mtime_ns) -> digest`` cache so files
+    whose stat is unchanged are never re-read. Call ``save()`` to persist
+    the cache; ``hash_files()`` does so automatically.
+    """
+
+    def __init__(
+        self,
+        cache_path: Optional[str] = None,
+        workers: Optional[int] = None,
+        chunk_size: int = 1024 * 1024,
+        max_entries: int = 1_000_000,
+    ) -> None:
+        if cache_path is None:
+            cache_path = os.path.join(
+                get_default_cache_directory("hashes"),
+                "stats.json",
+            )
+
+        if workers is None:
+            workers = min(32, (os.cpu_count() or 1) + 4)
+
+        self.cache_path = cache_path
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.max_entries = max_entries
+
+        self._digests = self._load()
+        self._changed = False
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._digests)
+
+    def hash_file(self, filepath: str) -> str:
+        file_stat = os.lstat(filepath)
+        stat_key = (
+            f"{file_stat.st_dev}:{file_stat.st_ino}:"
+            f"{file_stat.st_size}:{file_stat.st_mtime_ns}"
+        )
+
+        with self._lock:
+            digest = self._digests.pop(stat_key, None)
+
+            if digest is not None:
+                # Re-inserting keeps the dict in least-recently-used order.
+                self._digests[stat_key] = digest
+                return digest
+
+        hasher = hashlib.blake2b()
+
+        if stat.S_ISLNK(file_stat.st_mode):
+            hasher.update(b"symlink\0")
+            hasher.update(os.fsencode(os.readlink(filepath)))
+
+        else:
+            with open(filepath, "rb") as source:
+                for chunk in iter(lambda: source.read(self.chunk_size), b""):
+                    hasher.update(chunk)
+
+        digest = hasher.hexdigest()
+
+        if is_settled(file_stat):
+            with self._lock:
+                self._digests[stat_key] = digest
+                self._changed = True
+
+        return digest
+
+    def hash_files(self, filepaths: Iterable[str]) -> Dict[str, str]:
+        filepaths = list(filepaths)
+
+        if self.workers < 2 or len(filepaths) < 2:
+            digests = {filepath: self.hash_file(filepath) for filepath in filepaths}
+
+        else:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                digests = dict(
+                    zip(filepaths, executor.map(self.hash_file, filepaths))
+                )
+
+        self.save()
+
+        return digests
+
+    def save(self):
+        with self._lock:
+            if not self._changed:
+                return
+
+            while len(self._digests) > self.max_entries:
+                del self._digests[next(iter(self._digests))]
+
+            data = json.dumps(
+                {
+                    "format": FILE_HASHER_FORMAT,
+                    "digests": self._digests,
+                },
+                separators=(",", ":"),
+            ).encode()
+
+            self._changed = False
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.cache_path)), exist_ok=True)
+        AtomicWriter().write(self.cache_path, data)
+
+    def clear(self):
+        with self._lock:
+            self._digests.clear()
+            self._changed = True
+
+        self.save()
+
+    def _load(self) -> Dict[str, str]:
+        try:
+            with open(self.cache_path, "rb") as cache_file:
+                cached = json.load(cache_file)
+
+        except (FileNotFoundError, ValueError):
+            return {}
+
+        if not isinstance(cached, dict) or cached.get("format") != FILE_HASHER_FORMAT:
+            return {}
+
+        return cached.get("digests", {})
@@ -0,0 +1,141 @@
+import hashlib
+import io
+import os
+import pickle
+from typing import Any, BinaryIO, Callable, Iterable, List, Optional, TextIO
+
+from .directory_cache import DirectoryCache
+from .util import get_dcrx_version, get_default_cache_directory, is_settled
+
+# Bump whenever the parsed layer representation changes in a way the
+# package version alone would not capture.
+PARSE_CACHE_FORMAT = 1
+
+
+class ParseCache:
+    """
+    Opt-in on-disk cache of parsed Dockerfile layers, keyed by a hash of
+    the Dockerfile's content and the dcrx version. Files parsed through
+    parse_file() additionally record their mtime and size so unchanged
+    files are served without being read or hashed.
+
+    Entries are pickled layer lists, so the cache directory must only be
+    writable by trusted users.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        max_size: int = 256 * 1024 * 1024,
+    ) -> None:
+        if directory is None:
+            directory = get_default_cache_directory("parse")
+
+        self.directory = directory
+        self.version = f"{get_dcrx_version()}:{PARSE_CACHE_FORMAT}"
+
+        self._entries = DirectoryCache(directory, max_size)
+
+    @property
+    def max_size(self) -> int:
+        return self._entries.max_size
+
+    def parse(
+        self,
+        dockerfile: str | bytes | Iterable[str] | Iterable[bytes] | TextIO | BinaryIO,
+        parse: Callable[[bytes], List[Any]],
+    ) -> List[Any]:
+        content = self._to_bytes(dockerfile)
+        content_key = self._content_key(content)
+
+        if (layers := self._load(content_key)) is not None:
+            return layers
+
+        layers = parse(content)
+        self._store(content_key, layers)
+
+        return layers
+
+    def parse_file(
+        self,
+        filepath: str,
+        parse: Callable[[bytes], List[Any]],
+    ) -> List[Any]:
+        stat = os.stat(filepath)
+        stat_key = self._stat_key(filepath)
+        file_info = f"{stat.st_mtime_ns}:{stat.st_size}"
+
+        if stat_record := self._entries.get(stat_key):
+            recorded_info, content_key = stat_record.decode().rsplit(":", 1)
+
+            if recorded_info == file_info and (
+                layers := self._load(content_key)
+            ) is not None:
+                return layers
+
+        with open(filepath, "rb") as dockerfile:
+            content = dockerfile.read()
+
+        content_key = self._content_key(content)
+
+        if (layers := self._load(content_key)) is None:
+            layers = parse(content)
+            self._store(content_key, layers)
+
+        if is_settled(stat):
+            self._entries.put(stat_key, f"{file_info}:{content_key}".encode())
+
+        return layers
+
+    def clear(self):
+        self._entries.clear()
+
+    def _load(self, content_key: str) -> Optional[List[Any]]:
+        if (data := self._entries.get(content_key)) is None:
+            return None
+
+        try:
+            return pickle.loads(data)
+
+        except Exception:
+            return None
+
+    def _store(self, content_key: str, layers: List[Any]):
+        self._entries.put(
+            content_key,
+            pickle.dumps(layers, protocol=pickle.HIGHEST_PROTOCOL),
+        )
+
+    def _content_key(self, content: bytes) -> str:
+        content_hash = hashlib.blake2b(self.version.encode(), digest_size=20)
+        content_hash.update(b"\0")
+        content_hash.update(content)
+
+        return f"{content_hash.hexdigest()}.layers"
+
+    def _stat_key(self, filepath: str) -> str:
+        path_hash = hashlib.blake2b(self.version.encode(), digest_size=20)
+        path_hash.update(b"\0")
+        path_hash.update(os.path.abspath(filepath).encode())
+
+        return f"{path_hash.hexdigest()}.stat"
+
+    def _to_bytes(
+        self,
+        dockerfile: str | bytes | Iterable[str] | Iterable[bytes] | TextIO | BinaryIO,
+    ) -> bytes:
+        if isinstance(dockerfile, bytes):
+            return dockerfile
+
+        if isinstance(dockerfile, str):
+            return dockerfile.encode()
+
+        if isinstance(dockerfile, io.IOBase):
+            dockerfile = dockerfile.read()
+
+            return dockerfile if isinstance(dockerfile, bytes) else dockerfile.encode()
+
+        return b"\n".join(
+            (line if isinstance(line, bytes) else line.encode()).rstrip(b"\r\n")
+            for line in dockerfile
+        )
@@ -0,0 +1,29 @@
+import importlib.metadata
+import os
+import time
+
+
+def get_dcrx_version() -> str:
+    try:
+        return importlib.metadata.version("dcrx")
+
+    except importlib.metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def is_settled(file_stat: os.stat_result) -> bool:
+    """
+    Like git's racy-clean check, a file modified within the mtime
+    granularity of being read could change again without its stat
+    changing, so only files modified over a second ago have a stat that
+    can be trusted to stand for their content.
+    """
+    return time.time_ns() - file_stat.st_mtime_ns > 1_000_000_000
+
+
+def get_default_cache_directory(name: str) -> str:
+    cache_home = os.environ.get(
+        "XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache")
+    )
+
+    return os.path.join(cache_home, "dcrx", name)
@@ -6,6 +6,15 @@ from cocoa.cli import CLI, ImportInstance
 from taskex import Env, TaskRunner
 
 from dcrx.image import Image
+from dcrx.writers import AtomicWriter
+
+
+def _compile_image(image: Image, writer: AtomicWriter):
+    return image.to_file(writer=writer)
+
+
+def _is_changed(image: Image, writer: AtomicWriter):
+    return writer.is_changed(image.filename, image.to_string().encode())
 
 
 @CLI.command()
@@ -16,6 +25,7 @@ async def compile(
     runner = TaskRunner(config=Env(MERCURY_SYNC_EXECUTOR_TYPE="thread"))
     loop = asyncio.get_event_loop()
 
+    writer = AtomicWriter(batch=True)
     compilation_images: list[Image] = []
 
     for image in path.data.values():
@@ -29,23 +39,38 @@ async def compile(
                 f" - Building {image.full_name} at {image.filename}\n",
             )
 
+        # Existing files are compared by content, so rebuilding an
+        # unchanged image is not reported as a failure.
+        elif not await loop.run_in_executor(None, _is_changed, image, writer):
+            await loop.run_in_executor(
+                None,
+                sys.stdout.write,
+                f" - Unchanged {image.full_name} at {image.filename}\n",
+            )
+
         else:
             await loop.run_in_executor(
                 None,
                 sys.stdout.write,
-                f" - Failed to compile {image.full_name} to {image.filename} - already exists\n",
+                f" - Failed to compile {image.full_name} to {image.filename} - already exists with different content\n",
             )
 
-    runs = {
-        image: runner.run(
-            image.to_file,
+    # Runs share one task so each call receives its own image, rather than
+    # every run reusing the first image's bound to_file().
+    runs = [
+        runner.run(
+            _compile_image,
+            image,
+            writer,
         )
         for image in compilation_images
-    }
+    ]
+
+    completed = await runner.wait_all([run.token for run in runs])
 
-    await runner.wait_all([run.token for run in runs.values()])
+    await loop.run_in_executor(None, writer.sync)
 
-    for image, run in runs.items():
+    for image, run in zip(compilation_images, completed):
         if run.error:
             await loop.run_in_executor(
                 None,
@@ -53,6 +78,13 @@ async def compile(
                 f" - Failed to compile {image.full_name} to {image.filename} - {run.error}\n",
             )
 
+        elif run.result is False:
+            await loop.run_in_executor(
+                None,
+                sys.stdout.write,
+                f" - Unchanged {image.full_name} at {image.filename}\n",
+            )
+
         else:
             await loop.run_in_executor(
                 None,
@@ -0,0 +1,5 @@
+from .compact_layer import CompactLayer as CompactLayer
+from .compact_layer import from_compact as from_compact
+from .compact_layer import to_compact as to_compact
+from .render_table import RenderTable as RenderTable
+from .render_table import shared_render_table as shared_render_table
@@ -0,0 +1,268 @@
+from typing import Any, Dict, Iterator, Optional, Tuple, Type
+
+from pydantic import BaseModel
+
+from dcrx.layers import (
+    Add,
+    Arg,
+    Cmd,
+    Copy,
+    Entrypoint,
+    Env,
+    Expose,
+    Healthcheck,
+    Label,
+    Maintainer,
+    OnBuild,
+    Run,
+    Shell,
+    Stage,
+    StopSignal,
+    User,
+    Volume,
+    Workdir,
+)
+from dcrx.layers.mount_types import (
+    BindMount,
+    CacheMount,
+    SecretMount,
+    SSHMount,
+    TMPFSMount,
+)
+from dcrx.layers.trusted import construct
+
+from .render_table import shared_render_table
+
+_object_setattr = object.__setattr__
+
+
+class CompactLayer:
+    """
+    Immutable, slotted stand-in for a layer or mount model. Each compact
+    type stores only its field values (lists become tuples and nested
+    models become compact layers), has no per-instance ``__dict__`` or
+    fields-set tracking, renders through its model's ``to_string()``, and
+    compares and hashes by value. Rendered text is memoized on the
+    instance and interned across instances through shared_render_table.
+    """
+
+    __slots__ = ("_hash", "_rendered")
+
+    _model: Type[BaseModel]
+    _fields: Tuple[str, ...]
+    _discriminator: Tuple[str, str]
+
+    def __init__(self, *values: Any) -> None:
+        for name, value in zip(self._fields, values):
+            _object_setattr(self, name, value)
+
+        _object_setattr(self, "_hash", None)
+        _object_setattr(self, "_rendered", None)
+
+    def __setattr__(self, name: str, value: Any):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name: str):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __iter__(self) -> Iterator[Tuple[str, Any]]:
+        yield self._discriminator
+
+        for name in self._fields:
+            yield name, getattr(self, name)
+
+    def __eq__(self, other: object) -> bool:
+        if self is other:
+            return True
+
+        return (
+            type(self) is type(other)
+            and hash(self) == hash(other)
+            and self._key() == other._key()
+        )
+
+    def __hash__(self) -> int:
+        if (layer_hash := self._hash) is None:
+            layer_hash = hash((type(self), self._key()))
+            _object_setattr(self, "_hash", layer_hash)
+
+        return layer_hash
+
+    def __reduce__(self):
+        return (type(self), self._values())
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={value!r}" for name, value in self)
+
+        return f"{type(self).__name__}({fields})"
+
+    def _values(self) -> Tuple[Any, ...]:
+        return tuple(getattr(self, name) for name in self._fields)
+
+    def _key(self) -> Tuple[Any, ...]:
+        # 1, 1.0 and True compare equal but render differently, so value
+        # types are part of a compact layer's identity.
+        return tuple(_typed(getattr(self, name)) for name in self._fields)
+
+    def to_string(self) -> str:
+        if (rendered := self._rendered) is None:
+            rendered = shared_render_table.render(self)
+            _object_setattr(self, "_rendered", rendered)
+
+        return rendered
+
+    def to_model(self):
+        return construct(
+            self._model,
+            {name: _thaw(getattr(self, name)) for name in self._fields},
+        )
+
+    def model_dump(self) -> Dict[str, Any]:
+        return {name: _dump(value) for name, value in self}
+
+    def model_copy(self, update: Optional[Dict[str, Any]] = None):
+        if not update:
+            return self
+
+        return type(self)(
+            *[
+                _freeze(update[name]) if name in update else getattr(self, name)
+                for name in self._fields
+            ]
+        )
+
+
+def _compact_type(model: Type[BaseModel]) -> Type[CompactLayer]:
+    discriminator = "layer_type" if "layer_type" in model.model_fields else "mount_type"
+    discriminator_value = model.model_fields[discriminator].default
+
+    # The layer/mount type is constant per class, so it is a class-level
+    # property rather than a slot on every instance.
+    fields = tuple(name for name in model.model_fields if name != discriminator)
+    name = f"Compact{model.__name__}"
+
+    return type(
+        name,
+        (CompactLayer,),
+        {
+            "__slots__": fields,
+            "__module__": __name__,
+            "__qualname__": name,
+            "_model": model,
+            "_fields": fields,
+            "_discriminator": (discriminator, discriminator_value),
+            discriminator: property(lambda _: discriminator_value),
+            "_render": model.to_string,
+        },
+    )
+
+
+CompactBindMount = _compact_type(BindMount)
+CompactCacheMount = _compact_type(CacheMount)
+CompactSecretMount = _compact_type(SecretMount)
+CompactSSHMount = _compact_type(SSHMount)
+CompactTMPFSMount = _compact_type(TMPFSMount)
+
+CompactAdd = _compact_type(Add)
+CompactArg = _compact_type(Arg)
+CompactCmd = _compact_type(Cmd)
+CompactCopy = _compact_type(Copy)
+CompactEntrypoint = _compact_type(Entrypoint)
+CompactEnv = _compact_type(Env)
+CompactExpose = _compact_type(Expose)
+CompactHealthcheck = _compact_type(Healthcheck)
+CompactLabel = _compact_type(Label)
+CompactMaintainer = _compact_type(Maintainer)
+CompactOnBuild = _compact_type(OnBuild)
+CompactRun = _compact_type(Run)
+CompactShell = _compact_type(Shell)
+CompactStage = _compact_type(Stage)
+CompactStopSignal = _compact_type(StopSignal)
+CompactUser = _compact_type(User)
+CompactVolume = _compact_type(Volume)
+CompactWorkdir = _compact_type(Workdir)
+
+
+_compact_types: Dict[Type[BaseModel], Type[CompactLayer]] = {
+    compact_type._model: compact_type
+    for compact_type in (
+        CompactBindMount,
+        CompactCacheMount,
+        CompactSecretMount,
+        CompactSSHMount,
+        CompactTMPFSMount,
+        CompactAdd,
+        CompactArg,
+        CompactCmd,
+        CompactCopy,
+        CompactEntrypoint,
+        CompactEnv,
+        CompactExpose,
+        CompactHealthcheck,
+        CompactLabel,
+        CompactMaintainer,
+        CompactOnBuild,
+        CompactRun,
+        CompactShell,
+        CompactStage,
+        CompactStopSignal,
+        CompactUser,
+        CompactVolume,
+        CompactWorkdir,
+    )
+}
+
+
+def to_compact(layer: BaseModel | CompactLayer) -> CompactLayer:
+    if isinstance(layer, CompactLayer):
+        return layer
+
+    compact_type = _compact_types[type(layer)]
+
+    return compact_type(
+        *[_freeze(getattr(layer, name)) for name in compact_type._fields]
+    )
+
+
+def from_compact(layer: BaseModel | CompactLayer) -> BaseModel:
+    if isinstance(layer, CompactLayer):
+        return layer.to_model()
+
+    return layer
+
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return to_compact(value)
+
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+
+    return value
+
+
+def _typed(value: Any) -> Any:
+    if isinstance(value, tuple):
+        return (tuple, tuple(_typed(item) for item in value))
+
+    return (type(value), value)
+
+
+def _thaw(value: Any) -> Any:
+    if isinstance(value, CompactLayer):
+        return value.to_model()
+
+    if isinstance(value, tuple):
+        return [_thaw(item) for item in value]
+
+    return value
+
+
+def _dump(value: Any) -> Any:
+    if isinstance(value, CompactLayer):
+        return value.model_dump()
+
+    if isinstance(value, tuple):
+        return [_dump(item) for item in value]
+
+    return value
@@ -0,0 +1,45 @@
+import threading
+from typing import Any, Dict
+
+
+class RenderTable:
+    """
+    Interning table of rendered instruction text, keyed by compact layer
+    value. Identical compact layers - across any number of Image
+    instances - render once and share the same string. Compact layers are
+    immutable, so an entry can never go stale: a changed layer is a new
+    key. Oldest entries are dropped once max_size is reached.
+    """
+
+    def __init__(self, max_size: int = 65536) -> None:
+        self.max_size = max_size
+
+        self._rendered: Dict[Any, str] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._rendered)
+
+    def render(self, layer: Any) -> str:
+        if (rendered := self._rendered.get(layer)) is not None:
+            return rendered
+
+        rendered = layer._render()
+
+        with self._lock:
+            if (existing := self._rendered.get(layer)) is not None:
+                return existing
+
+            if len(self._rendered) >= self.max_size:
+                del self._rendered[next(iter(self._rendered))]
+
+            self._rendered[layer] = rendered
+
+        return rendered
+
+    def clear(self):
+        with self._lock:
+            self._rendered.clear()
+
+
+shared_render_table = RenderTable()
@@ -0,0 +1,3 @@
+from .context_walker import walk_sources as walk_sources
+from .context_writer import ContextWriter as ContextWriter
+from .dockerignore import DockerIgnore as DockerIgnore
@@ -0,0 +1,76 @@
+import glob
+import os
+from typing import Iterable, Iterator, Optional, Set, Tuple
+
+from .dockerignore import DockerIgnore, normalize_path
+
+
+def walk_sources(
+    context_path: str,
+    sources: Iterable[str],
+    ignore: Optional[DockerIgnore] = None,
+) -> Iterator[Tuple[str, str]]:
+    """
+    Yields ``(path, arcname)`` for every file reachable from the given
+    COPY/ADD sources, relative to ``context_path``. Sources may be files,
+    directories, or wildcards. Excluded directories are pruned as soon as
+    they are reached unless a ``!`` pattern could re-include something
+    beneath them, and each file is yielded once.
+    """
+    if ignore is None:
+        ignore = DockerIgnore()
+
+    seen: Set[str] = set()
+
+    for source in sources:
+        source = normalize_path(source)
+
+        if source == ".." or source.startswith("../"):
+            raise ValueError(
+                f"Source {source} is outside the build context {context_path}"
+            )
+
+        source_path = os.path.join(context_path, source)
+
+        if glob.has_magic(source):
+            matches = sorted(glob.glob(source_path))
+
+        else:
+            matches = [source_path]
+
+        for match in matches:
+            arcname = normalize_path(os.path.relpath(match, context_path))
+
+            if arcname and ignore.matches(arcname):
+                if not os.path.isdir(match) or ignore.can_prune(arcname):
+                    continue
+
+            if os.path.isdir(match):
+                yield from _walk_directory(match, arcname, ignore, seen)
+
+            elif arcname not in seen and os.path.lexists(match):
+                seen.add(arcname)
+                yield match, arcname
+
+
+def _walk_directory(
+    directory: str,
+    arcname: str,
+    ignore: DockerIgnore,
+    seen: Set[str],
+) -> Iterator[Tuple[str, str]]:
+    with os.scandir(directory) as scanned:
+        entries = sorted(scanned, key=lambda entry: entry.name)
+
+    for entry in entries:
+        entry_arcname = f"{arcname}/{entry.name}" if arcname else entry.name
+
+        if entry.is_dir(follow_symlinks=False):
+            if ignore.matches(entry_arcname) and ignore.can_prune(entry_arcname):
+                continue
+
+            yield from _walk_directory(entry.path, entry_arcname, ignore, seen)
+
+        elif entry_arcname not in seen and not ignore.matches(entry_arcname):
+            seen.add(entry_arcname)
+            yield entry.path, entry_arcname
@@ -0,0 +1,280 @@
+import hashlib
+import io
+import os
+import socket
+import stat
+import tarfile
+import time
+from typing import Any, BinaryIO, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from ..cache import FileHasher
+
+_executable_bits = stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH
+
+
+class DigestSink:
+    """
+    Forwards writes to a binary sink while feeding them to a SHA-256
+    hasher, so an archive's digest is known once it has been written.
+    """
+
+    def __init__(self, sink: BinaryIO) -> None:
+        self.sink = sink
+        self._hasher = hashlib.sha256()
+
+    def write(self, data: bytes) -> int:
+        self._hasher.update(data)
+        return self.sink.write(data)
+
+    def flush(self):
+        self.sink.flush()
+
+    def hexdigest(self) -> str:
+        return self._hasher.hexdigest()
+
+
+class ContextWriter:
+    """
+    Streams a Docker build context as an uncompressed tar into any
+    writable binary sink - a file, pipe, socket, or HTTP body - without
+    ever holding the archive in memory. Source files are copied in
+    fixed-size chunks, so memory use stays flat regardless of context size.
+
+    In ``reproducible`` mode member metadata is normalized - owner root
+    with empty names, mtimes clamped to ``SOURCE_DATE_EPOCH`` (or 0),
+    modes fixed to 0644/0755, and hardlinks stored as regular files - and
+    the archive's SHA-256 ``digest`` is computed as it is written.
+    Identical inputs added in the same order then yield identical bytes.
+
+    With ``deduplicate`` enabled, a regular file whose content matches one
+    already written is stored as a hardlink to it. Only files sharing a
+    size are hashed, through ``hasher`` when given so its stat cache spares
+    re-reading unchanged files.
+    """
+
+    def __init__(
+        self,
+        sink: Union[BinaryIO, socket.socket],
+        chunk_size: int = 1024 * 1024,
+        reproducible: bool = False,
+        source_date_epoch: Optional[int] = None,
+        deduplicate: bool = False,
+        hasher: Optional[FileHasher] = None,
+    ) -> None:
+        self.chunk_size = chunk_size
+        self.reproducible = reproducible
+        self.deduplicate = deduplicate
+        self.hasher = hasher
+
+        # Written files by size and metadata, as [arcname, path, digest or
+        # None], so only files that could be duplicates are ever hashed.
+        self._written: Dict[Tuple[Any, ...], List[List[Optional[str]]]] = {}
+        self._arcnames: Set[str] = set()
+
+        if source_date_epoch is None:
+            source_date_epoch = int(os.getenv("SOURCE_DATE_EPOCH", 0))
+
+        self.source_date_epoch = source_date_epoch
+
+        if isinstance(sink, socket.socket):
+            # Closing the socket file object leaves the socket itself open.
+            self._socket_file: Optional[BinaryIO] = sink.makefile("wb")
+            sink = self._socket_file
+
+        else:
+            self._socket_file = None
+
+        self.sink = sink
+        self._digest_sink: Optional[DigestSink] = None
+
+        if reproducible:
+            self._digest_sink = DigestSink(sink)
+            sink = self._digest_sink
+
+        self._archive = tarfile.open(
+            fileobj=sink,
+            mode="w|",
+            format=tarfile.PAX_FORMAT,
+            bufsize=chunk_size,
+            copybufsize=chunk_size,
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def digest(self) -> Optional[str]:
+        if self._digest_sink is None:
+            return None
+
+        return f"sha256:{self._digest_sink.hexdigest()}"
+
+    def add_bytes(
+        self,
+        arcname: str,
+        data: bytes,
+        mode: int = 0o644,
+    ):
+        info = tarfile.TarInfo(arcname)
+        info.size = len(data)
+        info.mode = mode
+        info.mtime = int(time.time())
+
+        self._archive.addfile(self._normalize(info), io.BytesIO(data))
+
+        # Generated members, such as the rendered Dockerfile, take
+        # precedence over files of the same name found on disk.
+        self._arcnames.add(arcname)
+
+    def add_lines(
+        self,
+        arcname: str,
+        lines: Iterable[str],
+        mode: int = 0o644,
+    ):
+        # Tar headers need the member size up front, so rendered text is
+        # encoded into a single buffer rather than streamed.
+        self.add_bytes(
+            arcname,
+            "".join(lines).encode(),
+            mode=mode,
+        )
+
+    def add_path(
+        self,
+        path: str,
+        arcname: Optional[str] = None,
+    ):
+        if arcname is None:
+            arcname = path
+
+        # Sources may overlap, as with a directory and a file inside it,
+        # but each member is written once.
+        if arcname in self._arcnames and (
+            os.path.islink(path) or not os.path.isdir(path)
+        ):
+            return
+
+        info = self._normalize(self._archive.gettarinfo(path, arcname=arcname))
+
+        if self.reproducible and info.islnk():
+            # Filesystem hardlinks depend on which inode the walk saw
+            # first, so they are stored as regular files instead.
+            info.type = tarfile.REGTYPE
+            info.linkname = ""
+            info.size = os.lstat(path).st_size
+
+        if info.isreg() and self.deduplicate and info.size > 0:
+            original = self._find_duplicate(path, arcname, info)
+
+            if original is not None:
+                info.type = tarfile.LNKTYPE
+                info.linkname = original
+                info.size = 0
+
+        if info.isreg():
+            with open(path, "rb") as source:
+                self._archive.addfile(info, source)
+
+        elif info.isdir():
+            if arcname not in self._arcnames:
+                self._archive.addfile(info)
+
+            with os.scandir(path) as entries:
+                for entry in sorted(entries, key=lambda entry: entry.name):
+                    self.add_path(
+                        entry.path,
+                        arcname=f"{arcname.rstrip('/')}/{entry.name}",
+                    )
+
+        else:
+            self._archive.addfile(info)
+
+        self._arcnames.add(arcname)
+
+    def close(self):
+        self._archive.close()
+
+        if self._socket_file is not None:
+            self._socket_file.close()
+
+        else:
+            self.sink.flush()
+
+    def _find_duplicate(
+        self,
+        path: str,
+        arcname: str,
+        info: tarfile.TarInfo,
+    ) -> Optional[str]:
+        # Hardlink members take their mode and owner from the member they
+        # link to, so only files whose (normalized) metadata also matches
+        # may share content.
+        if self.reproducible:
+            key = (info.size, info.mode)
+
+        else:
+            key = (
+                info.size,
+                info.mode,
+                info.uid,
+                info.gid,
+                info.uname,
+                info.gname,
+                int(info.mtime),
+            )
+
+        written = self._written.setdefault(key, [])
+
+        if written:
+            digest = self._hash(path)
+
+            for entry in written:
+                if entry[2] is None:
+                    entry[2] = self._hash(entry[1])
+
+                if entry[2] == digest:
+                    return entry[0]
+
+            written.append([arcname, path, digest])
+
+        else:
+            written.append([arcname, path, None])
+
+        return None
+
+    def _hash(self, path: str) -> str:
+        if self.hasher is not None:
+            return self.hasher.hash_file(path)
+
+        hasher = hashlib.blake2b()
+
+        with open(path, "rb") as source:
+            for chunk in iter(lambda: source.read(self.chunk_size), b""):
+                hasher.update(chunk)
+
+        return hasher.hexdigest()
+
+    def _normalize(self, info: tarfile.TarInfo) -> tarfile.TarInfo:
+        if not self.reproducible:
+            return info
+
+        info.uid = 0
+        info.gid = 0
+        info.uname = ""
+        info.gname = ""
+        info.mtime = min(int(info.mtime), self.source_date_epoch)
+
+        if info.issym():
+            info.mode = 0o777
+
+        elif info.isdir() or info.mode & _executable_bits:
+            info.mode = 0o755
+
+        else:
+            info.mode = 0o644
+
+        return info
@@ -0,0 +1,183 @@
+import posixpath
+import re
+from typing import Iterable, List, Tuple
+
+
+def normalize_path(path: str) -> str:
+    path = posixpath.normpath(path.replace("\\", "/")).lstrip("/")
+
+    if path == ".":
+        return ""
+
+    return path
+
+
+def translate_pattern(pattern: str) -> str:
+    """
+    Translates one .dockerignore pattern into a regular expression,
+    following Docker's rules: ``*`` and ``?`` never cross ``/``, ``**``
+    spans any number of directories (including none), ``[...]`` is a
+    character class and ``\\`` escapes the next character.
+    """
+    expression: List[str] = []
+    idx = 0
+    length = len(pattern)
+
+    while idx < length:
+        char = pattern[idx]
+
+        if char == "*":
+            if idx + 1 < length and pattern[idx + 1] == "*":
+                idx += 1
+
+                if idx + 1 < length and pattern[idx + 1] == "/":
+                    idx += 1
+                    expression.append("(?:.*/)?")
+
+                else:
+                    expression.append(".*")
+
+            else:
+                expression.append("[^/]*")
+
+        elif char == "?":
+            expression.append("[^/]")
+
+        elif char == "[":
+            end = pattern.find("]", idx + 1)
+
+            if end == -1:
+                expression.append(re.escape(char))
+
+            else:
+                char_class = pattern[idx + 1 : end].replace("\\", "\\\\")
+
+                if char_class.startswith("!"):
+                    char_class = f"^{char_class[1:]}"
+
+                expression.append(f"[{char_class}]")
+                idx = end
+
+        elif char == "\\" and idx + 1 < length:
+            idx += 1
+            expression.append(re.escape(pattern[idx]))
+
+        else:
+            expression.append(re.escape(char))
+
+        idx += 1
+
+    return "".join(expression)
+
+
+class DockerIgnore:
+    """
+    A compiled .dockerignore matcher. Patterns are evaluated last match
+    wins, ``!`` patterns re-include paths, and a pattern matching any
+    parent directory matches everything beneath it. ``can_prune`` tells a
+    walker when an excluded directory cannot contain re-included paths,
+    so it can be skipped without descending into it.
+    """
+
+    def __init__(self, patterns: Iterable[str] = ()) -> None:
+        self.patterns: List[Tuple[bool, re.Pattern, Tuple[re.Pattern, ...]]] = []
+
+        for line in patterns:
+            line = line.strip()
+
+            if not line or line.startswith("#"):
+                continue
+
+            include = line.startswith("!")
+            if include:
+                line = line[1:].strip()
+
+            pattern = normalize_path(line)
+            if not pattern:
+                continue
+
+            self.patterns.append(
+                (
+                    include,
+                    re.compile(translate_pattern(pattern)),
+                    tuple(
+                        re.compile(translate_pattern(part))
+                        for part in pattern.split("/")
+                    ),
+                )
+            )
+
+        self._includes = [
+            parts for include, _, parts in self.patterns if include
+        ]
+
+        # Evaluating from the last pattern lets matching stop at the first
+        # hit instead of scanning every pattern for every path.
+        self._reversed = list(reversed(self.patterns))
+
+    def __bool__(self) -> bool:
+        return len(self.patterns) > 0
+
+    @classmethod
+    def from_file(cls, filepath: str):
+        try:
+            with open(filepath) as dockerignore:
+                return cls(dockerignore.read().splitlines())
+
+        except FileNotFoundError:
+            return cls()
+
+    def matches(self, path: str) -> bool:
+        """
+        Returns True if ``path``, relative to the context root, is
+        excluded from the build context.
+        """
+        if not self.patterns:
+            return False
+
+        path = normalize_path(path)
+        candidates = [path]
+
+        parent = posixpath.dirname(path)
+        while parent:
+            candidates.append(parent)
+            parent = posixpath.dirname(parent)
+
+        for include, pattern, _ in self._reversed:
+            if any(pattern.fullmatch(candidate) for candidate in candidates):
+                return not include
+
+        return False
+
+    def can_prune(self, directory: str) -> bool:
+        """
+        Returns True if no ``!`` pattern could re-include a path beneath
+        an excluded ``directory``.
+        """
+        directory_parts = normalize_path(directory).split("/")
+
+        for parts in self._includes:
+            if self._could_match_within(directory_parts, parts):
+                return False
+
+        return True
+
+    def _could_match_within(
+        self,
+        directory_parts: List[str],
+        pattern_parts: Tuple[re.Pattern, ...],
+    ) -> bool:
+        for idx, directory_part in enumerate(directory_parts):
+            if idx >= len(pattern_parts):
+                return True
+
+            # A ``**`` can absorb any remaining directories.
+            part = pattern_parts[idx]
+            if ".*" in part.pattern:
+                return True
+
+            if not part.fullmatch(directory_part):
+                return False
+
+        return True
+
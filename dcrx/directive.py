@@ -1,6 +1,9 @@
+import io
 import re
 from enum import Enum
-from typing import Literal, Dict, List
+from types import MappingProxyType
+from typing import BinaryIO, Literal, Iterable, Iterator, List, Mapping, Optional, TextIO
+from .cache import ParseCache
 from .layers import (
     Add,
     Arg,
@@ -44,99 +47,113 @@ class Directive(Enum):
     WORKDIR='WORKDIR'
 
 
-class Directives:
+_instruction_pattern = re.compile(
+    r'\s*(' + '|'.join(
+        directive.value for directive in Directive
+    ) + r')(?:\s+|$)(.*)',
+    re.IGNORECASE | re.DOTALL
+)
 
-    def __init__(self) -> None:
-        self._directives: Dict[
-            Literal[
-                'ADD',
-                'ARG',
-                'CMD',
-                'COPY',
-                'ENTRYPOINT',
-                'ENV',
-                'EXPOSE',
-                'FROM',
-                'HEALTHCHECK',
-                'LABEL',
-                'MAINTAINER',
-                'ONBUILD',
-                'RUN',
-                'SHELL',
-                'STOPSIGNAL',
-                'USER',
-                'VOLUME',
-                'WORKDIR'
-            ],
-            Directive
-        ] = {
-            'ADD': Directive.ADD,
-            'ARG': Directive.ARG,
-            'CMD': Directive.CMD,
-            'COPY': Directive.COPY,
-            'ENTRYPOINT': Directive.ENTRYPOINT,
-            'ENV': Directive.ENV,
-            'EXPOSE': Directive.EXPOSE,
-            'FROM': Directive.FROM,
-            'HEALTHCHECK': Directive.HEALTHCHECK,
-            'LABEL': Directive.LABEL,
-            'MAINTAINER': Directive.MAINTAINER,
-            'ONBUILD': Directive.ONBUILD,
-            'RUN': Directive.RUN,
-            'SHELL': Directive.SHELL,
-            'STOPSIGNAL': Directive.STOPSIGNAL,
-            'USER': Directive.USER,
-            'VOLUME': Directive.VOLUME,
-            'WORKDIR': Directive.WORKDIR
-        }
+_escape_directive_pattern = re.compile(
+    r'#\s*escape\s*=\s*([\\`])\s*$',
+    re.IGNORECASE
+)
 
-        self._layers: Dict[
-            Directive,
-            Add |
-            Arg |
-            Cmd |
-            Copy |
-            Entrypoint |
-            Env |
-            Expose |
-            Healthcheck |
-            Label |
-            Maintainer |
-            OnBuild |
-            Run |
-            Shell |
-            Stage |
-            StopSignal |
-            User |
-            Volume | 
-            Workdir
-        ] = {
-            Directive.ADD: Add,
-            Directive.ARG: Arg,
-            Directive.CMD: Cmd,
-            Directive.COPY: Copy,
-            Directive.ENTRYPOINT: Entrypoint,
-            Directive.ENV: Env,
-            Directive.EXPOSE: Expose,
-            Directive.FROM: Stage,
-            Directive.HEALTHCHECK: Healthcheck,
-            Directive.LABEL: Label,
-            Directive.MAINTAINER: Maintainer,
-            Directive.ONBUILD: OnBuild,
-            Directive.RUN: Run,
-            Directive.SHELL: Shell,
-            Directive.STOPSIGNAL: StopSignal,
-            Directive.USER: User,
-            Directive.VOLUME: Volume,
-            Directive.WORKDIR: Workdir
-        }
+_directives: Mapping[
+    Literal[
+        'ADD',
+        'ARG',
+        'CMD',
+        'COPY',
+        'ENTRYPOINT',
+        'ENV',
+        'EXPOSE',
+        'FROM',
+        'HEALTHCHECK',
+        'LABEL',
+        'MAINTAINER',
+        'ONBUILD',
+        'RUN',
+        'SHELL',
+        'STOPSIGNAL',
+        'USER',
+        'VOLUME',
+        'WORKDIR'
+    ],
+    Directive
+] = MappingProxyType({
+    'ADD': Directive.ADD,
+    'ARG': Directive.ARG,
+    'CMD': Directive.CMD,
+    'COPY': Directive.COPY,
+    'ENTRYPOINT': Directive.ENTRYPOINT,
+    'ENV': Directive.ENV,
+    'EXPOSE': Directive.EXPOSE,
+    'FROM': Directive.FROM,
+    'HEALTHCHECK': Directive.HEALTHCHECK,
+    'LABEL': Directive.LABEL,
+    'MAINTAINER': Directive.MAINTAINER,
+    'ONBUILD': Directive.ONBUILD,
+    'RUN': Directive.RUN,
+    'SHELL': Directive.SHELL,
+    'STOPSIGNAL': Directive.STOPSIGNAL,
+    'USER': Directive.USER,
+    'VOLUME': Directive.VOLUME,
+    'WORKDIR': Directive.WORKDIR
+})
+
+_directive_layers: Mapping[
+    Directive,
+    Add |
+    Arg |
+    Cmd |
+    Copy |
+    Entrypoint |
+    Env |
+    Expose |
+    Healthcheck |
+    Label |
+    Maintainer |
+    OnBuild |
+    Run |
+    Shell |
+    Stage |
+    StopSignal |
+    User |
+    Volume | 
+    Workdir
+] = MappingProxyType({
+    Directive.ADD: Add,
+    Directive.ARG: Arg,
+    Directive.CMD: Cmd,
+    Directive.COPY: Copy,
+    Directive.ENTRYPOINT: Entrypoint,
+    Directive.ENV: Env,
+    Directive.EXPOSE: Expose,
+    Directive.FROM: Stage,
+    Directive.HEALTHCHECK: Healthcheck,
+    Directive.LABEL: Label,
+    Directive.MAINTAINER: Maintainer,
+    Directive.ONBUILD: OnBuild,
+    Directive.RUN: Run,
+    Directive.SHELL: Shell,
+    Directive.STOPSIGNAL: StopSignal,
+    Directive.USER: User,
+    Directive.VOLUME: Volume,
+    Directive.WORKDIR: Workdir
+})
+
+
+class Directives:
 
-        self._directive_names = list(self._directives.keys())
-        self._directives_pattern = re.compile(
-            '|'.join(self._directive_names)
-        )
-        self._file_data: List[str] = []
-        self._docker_file_lines: List[str] = []
+    def __init__(self) -> None:
+        # Directives holds no per-parse state. The lookup tables are shared,
+        # read-only module constants and lex()/iter_parse() keep everything
+        # else in locals, so one instance can be reused across calls and
+        # shared between threads.
+        self._directives = _directives
+        self._layers = _directive_layers
+        self._directive_names = tuple(_directives.keys())
 
     def __iter__(self):
         for directive_name in self._directives:
@@ -177,13 +194,60 @@ class Directives:
         self,
         file_line: str
     ):
-        return len([
-            directive_name for directive_name in self._directives if directive_name in file_line
-        ])
-    
+        return self.from_file_line(file_line) is not None
+
+    def lex(
+        self,
+        dockerfile: Iterable[str] | Iterable[bytes]
+    ) -> Iterator[str]:
+        """
+        Reads physical Dockerfile lines once, yielding each logical
+        instruction line. Comments and blank lines are dropped, escaped
+        line continuations are joined, and an instruction keyword is only
+        recognized at the start of a line that is not itself a continuation.
+        """
+        escape = '\\'
+        parser_directives = True
+        continuing = False
+        instruction: List[str] = []
+
+        for line in dockerfile:
+            if isinstance(line, bytes):
+                line = line.decode()
+
+            line = line.strip()
+
+            if len(line) < 1:
+                continue
+
+            if line[0] == '#':
+                if parser_directives and (
+                    escape_directive := _escape_directive_pattern.match(line)
+                ):
+                    escape = escape_directive.group(1)
+
+                continue
+
+            parser_directives = False
+
+            if not continuing and _instruction_pattern.match(line) and len(instruction) > 0:
+                yield ' '.join(instruction)
+                instruction = []
+
+            continuing = line.endswith(escape)
+            if continuing:
+                line = line[:-1].rstrip()
+
+            if len(line) > 0:
+                instruction.append(line)
+
+        if len(instruction) > 0:
+            yield ' '.join(instruction)
+
     def parse(
         self,
-        dockerfile: str | List[str] | bytes | List[bytes]
+        dockerfile: str | List[str] | bytes | List[bytes] | TextIO | BinaryIO,
+        cache: Optional[ParseCache] = None
     ) -> List[
         Add |
         Arg |
@@ -204,52 +268,48 @@ class Directives:
         Volume | 
         Workdir
     ]:
-        
-        if isinstance(dockerfile, str):
-            self._file_data.extend(
-                dockerfile.split('\n')
-            )
-
-        elif isinstance(dockerfile, bytes):
-            self._file_data.extend(
-                dockerfile.decode().split('\n')
-            )
-
-        else:
-            for line in dockerfile:
-                if isinstance(line, bytes):
-                    line = line.decode()
-
-                self._file_data.append(line)
-
-        self._file_data = [
-            line for line in self._file_data if not line.strip().startswith('#') and len(line) > 0
-        ]
-        
-        self._docker_file_lines: List[str] = []
-
-        current_line = ''
-        if len(self._file_data) > 0:
-            current_line = self._file_data[0]
+        if cache is not None:
+            return cache.parse(dockerfile, self.parse)
 
-        for line in self._file_data[1:]:
-            if self.from_file_line(line):
-                self._docker_file_lines.append(
-                    str(current_line)
-                )
-                current_line = line
+        return list(self.iter_parse(dockerfile))
 
-            else:
-                current_line += line
+    def iter_parse(
+        self,
+        dockerfile: str | bytes | Iterable[str] | Iterable[bytes] | TextIO | BinaryIO
+    ) -> Iterator[
+        Add |
+        Arg |
+        Cmd |
+        Copy |
+        Entrypoint |
+        Env |
+        Expose |
+        Healthcheck |
+        Label |
+        Maintainer |
+        OnBuild |
+        Run |
+        Shell |
+        Stage |
+        StopSignal |
+        User |
+        Volume | 
+        Workdir
+    ]:
+        """
+        Yields each layer as soon as its instruction has been read. File
+        objects (including stdin) and line iterators are consumed lazily,
+        so memory use does not grow with the size of the Dockerfile.
+        """
+        if isinstance(dockerfile, str):
+            dockerfile = io.StringIO(dockerfile)
 
-        self._docker_file_lines.append(current_line)
+        elif isinstance(dockerfile, bytes):
+            dockerfile = io.BytesIO(dockerfile)
 
-        docker_directives = []
-        for docker_file_line in self._docker_file_lines:
+        for docker_file_line in self.lex(dockerfile):
             if directive := self.parse_directive(docker_file_line):
-                docker_directives.append(directive)
-
-        return docker_directives
+                yield directive
     
     def from_file_line(
         self,
@@ -273,19 +333,19 @@ class Directives:
         'USER',
         'VOLUME',
         'WORKDIR'
-    ]:
+    ] | None:
 
-        if matches := re.search(
-            self._directives_pattern,
-            directive_line
-        ):
-            return matches.group(0)
+        if matches := _instruction_pattern.match(directive_line):
+            return matches.group(1).upper()
         
     def parse_directive(
         self,
         directive_line: str
     ):
-        if directive_name := self.from_file_line(directive_line):
+        if matches := _instruction_pattern.match(directive_line):
+            directive_name = matches.group(1).upper()
             directive_type = self._directives[directive_name]
-            return self._layers[directive_type].parse(directive_line)
-        
+
+            return self._layers[directive_type].parse(
+                f'{directive_name} {matches.group(2)}'
+            )
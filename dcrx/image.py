@@ -1,13 +1,37 @@
+import glob
 import importlib
 import importlib.util
+import io
 import ntpath
 import os
 import pathlib
+import pickle
 import re
+import shutil
+import socket
 import sys
-import tarfile
-from typing import Any, Callable, Dict, List, Literal, Optional, Set, Tuple, Union
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import (
+    Any,
+    BinaryIO,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Literal,
+    Optional,
+    Set,
+    TextIO,
+    Tuple,
+    Union,
+)
 
+from .cache import ContextCache, FileHasher, ParseCache
+from .compact import CompactLayer, to_compact
+from .context import ContextWriter, DockerIgnore, walk_sources
+from .context.dockerignore import normalize_path
 from .directive import Directives
 from .layers import (
     Add,
@@ -41,8 +65,50 @@ from .layers.mount_types import (
     TMPFSMount,
     TMPFSMountConfig,
 )
-from .memory_file import MemoryFile
+from .layers.trusted import replace
+from .layers.tokenizer import tokenize
+from .memory_file import MemfdFile, MemoryFile, SpooledMemoryFile
 from .queries import LayerQuery
+from .resolved_image import ResolvedImage
+from .variables import Definition, compile_template, resolve_definitions
+from .writers import AtomicWriter
+
+_worker_parse_cache: Optional[ParseCache] = None
+
+_remote_source_pattern = re.compile(r"^(?:[a-z][a-z0-9+.-]*://|git@)", re.IGNORECASE)
+
+
+def _init_parse_worker(
+    cache_directory: Optional[str] = None,
+    cache_max_size: Optional[int] = None,
+):
+    global _worker_parse_cache
+
+    _worker_parse_cache = None
+    if cache_directory is not None:
+        _worker_parse_cache = ParseCache(cache_directory, max_size=cache_max_size)
+
+
+def _parse_dockerfile_layers(filepath: str):
+    directives = Directives()
+
+    try:
+        if _worker_parse_cache is not None:
+            return _worker_parse_cache.parse_file(filepath, directives.parse)
+
+        with open(filepath) as dockerfile:
+            return list(directives.iter_parse(dockerfile))
+
+    except Exception as err:
+        # Errors are returned rather than raised so one bad Dockerfile does
+        # not abort the batch, and must survive the trip back from the pool.
+        try:
+            pickle.dumps(err)
+
+        except Exception:
+            err = RuntimeError(f"{type(err).__name__}: {err}")
+
+        return err
 
 
 class Image:
@@ -57,6 +123,7 @@ class Image:
         self.tag = tag
         self.path = path
         self.files: List[str] = []
+        self.context_digest: Optional[str] = None
 
         if filename is None:
             stub = name.replace("/", ".")
@@ -83,6 +150,7 @@ class Image:
             | Volume
             | Workdir
         ] = []
+        self._layer_index: Dict[str, List[int]] = defaultdict(list)
 
         self._mount_types: Dict[
             str,
@@ -105,13 +173,6 @@ class Image:
         }
 
         self.directives = Directives()
-        self._variable_template_pattern = re.compile(r"(\$\{)([^\}]+)\}|(\$)([\w]+)")
-
-        self._variable_resolved_name_pattern = re.compile(
-            r"(?<=\$\{).+?(?=:-|\})|(?<=\$)([\w]+)"
-        )
-
-        self._variable_clean_pattern = re.compile(r"\$|\{|\}")
 
     @property
     def full_name(self):
@@ -152,7 +213,12 @@ class Image:
         }
 
     @classmethod
-    def generate_from_file(cls, filepath: str, output_path: Optional[str] = None):
+    def generate_from_file(
+        cls,
+        filepath: str,
+        output_path: Optional[str] = None,
+        cache: Optional[ParseCache] = None,
+    ):
         layers: List[
             Add
             | Arg
@@ -175,30 +241,165 @@ class Image:
         ] = []
 
         directives = Directives()
+
+        if cache is not None:
+            layers.extend(cache.parse_file(filepath, directives.parse))
+
+        else:
+            with open(filepath) as dockerfile:
+                layers.extend(directives.iter_parse(dockerfile))
+
+        return cls._from_parsed_layers(filepath, layers, output_path=output_path)
+
+    @classmethod
+    def generate_from_files(
+        cls,
+        filepaths: str | List[str],
+        workers: Optional[int] = None,
+        chunksize: Optional[int] = None,
+        cache: Optional[ParseCache] = None,
+    ) -> Dict[str, Union["Image", Exception]]:
+        """
+        Parses many Dockerfiles - a list of paths or a recursive glob - across
+        a process pool. Returns a dict mapping each path to its Image or, if
+        that Dockerfile failed to parse, to the raised exception.
+        """
+        if isinstance(filepaths, str):
+            filepaths = sorted(glob.glob(filepaths, recursive=True))
+
+        if workers is None:
+            workers = os.cpu_count() or 1
+
+        if chunksize is None:
+            chunksize = max(1, len(filepaths) // (workers * 4))
+
+        cache_directory: Optional[str] = None
+        cache_max_size: Optional[int] = None
+        if cache is not None:
+            cache_directory = cache.directory
+            cache_max_size = cache.max_size
+
+        if workers < 2 or len(filepaths) < 2:
+            _init_parse_worker(cache_directory, cache_max_size)
+            parsed = [_parse_dockerfile_layers(filepath) for filepath in filepaths]
+
+        else:
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_parse_worker,
+                initargs=(cache_directory, cache_max_size),
+            ) as executor:
+                parsed = list(
+                    executor.map(
+                        _parse_dockerfile_layers,
+                        filepaths,
+                        chunksize=chunksize,
+                    )
+                )
+
+        images: Dict[str, Union[Image, Exception]] = {}
+        for filepath, layers in zip(filepaths, parsed):
+            if isinstance(layers, Exception):
+                images[filepath] = layers
+                continue
+
+            try:
+                images[filepath] = cls._from_parsed_layers(filepath, layers)
+
+            except Exception as err:
+                images[filepath] = err
+
+        return images
+
+    @classmethod
+    def _from_parsed_layers(
+        cls,
+        filepath: str,
+        layers: List[
+            Add
+            | Arg
+            | Cmd
+            | Copy
+            | Entrypoint
+            | Env
+            | Expose
+            | Healthcheck
+            | Label
+            | Maintainer
+            | OnBuild
+            | Run
+            | Shell
+            | Stage
+            | StopSignal
+            | User
+            | Volume
+            | Workdir
+        ],
+        output_path: Optional[str] = None,
+    ):
         filename = pathlib.Path(filepath).name
 
-        with open(filepath) as dockerfile:
-            layers.extend(directives.parse(dockerfile.readlines()))
+        image_sources: List[Stage] = [
+            layer for layer in layers if layer.layer_type == "stage"
+        ]
 
-            image_sources: Stage = [
-                layer for layer in layers if layer.layer_type == "stage"
-            ]
+        if len(image_sources) < 1:
+            raise ValueError(f"Dockerfile {filepath} has no FROM instruction")
 
-            image_source: Stage = image_sources[-1]
+        image_source = image_sources[-1]
 
-            if output_path:
-                filename = output_path
+        if output_path:
+            filename = output_path
 
-            image = Image(
-                image_source.base,
-                tag=image_source.tag,
-                filename=filename,
-                path=output_path,
-            )
+        image = Image(
+            image_source.base,
+            tag=image_source.tag,
+            filename=filename,
+            path=output_path,
+        )
 
-            image.from_layers(layers)
+        image.from_layers(layers)
 
-            return image
+        return image
+
+    @classmethod
+    def iter_from_file(
+        cls, filepath: str | TextIO | BinaryIO
+    ) -> Iterator[
+        Add
+        | Arg
+        | Cmd
+        | Copy
+        | Entrypoint
+        | Env
+        | Expose
+        | Healthcheck
+        | Label
+        | Maintainer
+        | OnBuild
+        | Run
+        | Shell
+        | Stage
+        | StopSignal
+        | User
+        | Volume
+        | Workdir
+    ]:
+        """
+        Lazily parses a Dockerfile path, open file object, or stdin (``-``),
+        yielding each layer as soon as its instruction has been read.
+        """
+        directives = Directives()
+
+        if filepath == "-":
+            yield from directives.iter_parse(sys.stdin)
+
+        elif isinstance(filepath, str):
+            with open(filepath) as dockerfile:
+                yield from directives.iter_parse(dockerfile)
+
+        else:
+            yield from directives.iter_parse(filepath)
 
     @classmethod
     def generate_from_string(
@@ -252,8 +453,9 @@ class Image:
 
         return image
 
-    def from_string(self, dockerfile: str):
-        self._layers.extend(self.directives.parse(dockerfile))
+    def from_string(self, dockerfile: str | bytes | TextIO | BinaryIO):
+        for layer in self.directives.iter_parse(dockerfile):
+            self._append_layer(layer)
 
         return self
 
@@ -262,7 +464,8 @@ class Image:
         self.filename = filename
 
         with open(filepath) as dockerfile:
-            self._layers.extend(self.directives.parse(dockerfile.readlines()))
+            for layer in self.directives.iter_parse(dockerfile):
+                self._append_layer(layer)
 
         return self
 
@@ -287,10 +490,49 @@ class Image:
             | User
             | Volume
             | Workdir
+            | CompactLayer
         ] = [],
     ):
         self._layers = layers
 
+        self._layer_index = defaultdict(list)
+        for idx, layer in enumerate(layers):
+            self._layer_index[layer.layer_type].append(idx)
+
+        return self
+
+    def _append_layer(
+        self,
+        layer: Add
+        | Arg
+        | Cmd
+        | Copy
+        | Entrypoint
+        | Env
+        | Expose
+        | Healthcheck
+        | Label
+        | Maintainer
+        | OnBuild
+        | Run
+        | Shell
+        | Stage
+        | StopSignal
+        | User
+        | Volume
+        | Workdir
+        | CompactLayer,
+    ):
+        self._layer_index[layer.layer_type].append(len(self._layers))
+        self._layers.append(layer)
+
+    def compact(self):
+        """
+        Converts this Image's layers to their immutable compact form, whose
+        rendered text is memoized and shared across Image instances.
+        """
+        self._layers = [to_compact(layer) for layer in self._layers]
+
         return self
 
     def layers(
@@ -348,7 +590,7 @@ class Image:
             layers = []
             for layer_type in layer_types:
                 layers.extend(
-                    [layer for layer in self._layers if layer.layer_type == layer_type]
+                    [self._layers[idx] for idx in self._layer_index.get(layer_type, ())]
                 )
 
             return LayerQuery(layers)
@@ -356,47 +598,165 @@ class Image:
         if attribute:
             attribute_name, attribute_value = attribute
             layers = LayerQuery(self._layers)
-            return layers.get(attribute_name, attribute_value)
+            return layers.get((attribute_name, attribute_value))
 
         return LayerQuery(self._layers)
 
     def resolve(self, defaults: Dict[str, str] = {}, skip: List[str] = []):
-        resolved_args = self.get_resolved_args()
-        resolved_args.update(defaults)
+        image = Image(self.name, tag=self.tag, filename=self.filename, path=self.path)
 
-        resolved_args = {
-            arg: value for arg, value in resolved_args.items() if arg not in skip
-        }
+        image.from_layers(list(self.resolved(defaults=defaults, skip=skip)))
 
-        layers = list(self._layers)
+        return image
 
-        for idx, layer in enumerate(layers):
-            if isinstance(layer, Arg):
-                layer_data = layer.model_dump()
-                layer_data["default"] = resolved_args.get(layer.name, layer.default)
+    def resolved(
+        self,
+        defaults: Dict[str, str] = {},
+        skip: List[str] = [],
+    ) -> ResolvedImage:
+        """
+        Returns a lazy view of this Image with variables substituted. Layers
+        are resolved on first access and cached, so rendering or querying
+        part of the view only pays for the layers it touches.
+        """
+        return ResolvedImage(self, defaults=defaults, skip=skip)
+
+    def _resolve_layer_at(
+        self,
+        position: int,
+        scopes: List[Dict[str, Any]],
+        layer_scopes: List[int],
+        layer_values: Dict[int, List[Optional[str]]],
+        skip: List[str],
+    ):
+        # Resolved layers are copies of already validated layers with
+        # substituted strings, so they are built through the trusted path
+        # rather than re-validated.
+        layer = self._layers[position]
+
+        if layer.layer_type == "arg":
+            default = layer_values[position][0]
+
+            if layer.name not in skip and default is not None:
+                layer = self._replace_layer(layer, {"default": default})
+
+            return layer
+
+        if layer.layer_type == "env":
+            return self._replace_layer(
+                layer,
+                {
+                    "values": [
+                        value if key in skip else resolved_value
+                        for key, value, resolved_value in zip(
+                            layer.keys, layer.values, layer_values[position]
+                        )
+                    ]
+                },
+            )
 
-                layers[idx] = Arg(**layer_data)
+        return self._resolve_layer(layer, scopes[layer_scopes[position]])
 
-            elif isinstance(layer, Env):
-                values = []
-                for key_idx, key in enumerate(layer.keys):
-                    values.append(resolved_args.get(key, layer.values[key_idx]))
+    def get_resolved_args(self, defaults: Dict[str, str] = {}):
+        """
+        Returns every resolved ARG and ENV value, with later stages taking
+        precedence over earlier ones and over global ARGs.
+        """
+        resolved_args: Dict[str, Any] = {}
 
-                layer_data = layer.model_dump()
-                layer_data["values"] = values
-                layers[idx] = Env(**layer_data)
+        for scope in self.get_resolved_scopes(defaults):
+            resolved_args.update(scope)
 
-        image = Image(self.name, tag=self.tag, filename=self.filename, path=self.path)
+        return resolved_args
 
-        image.from_layers(layers)
+    def get_resolved_scopes(self, defaults: Dict[str, str] = {}) -> List[Dict[str, Any]]:
+        """
+        Returns the resolved variables of each scope: first the global ARGs
+        declared before any ``FROM``, then one mapping per stage.
+        """
+        scopes, _, _ = self._resolve_variables(defaults)
+
+        return scopes
 
-        resolved_layers: List[
+    def _resolve_variables(
+        self,
+        defaults: Dict[str, str],
+        skip: List[str] = [],
+    ) -> Tuple[List[Dict[str, Any]], List[int], Dict[int, List[Optional[str]]]]:
+        """
+        Resolves ARG/ENV values scope by scope, each reference taking the
+        value defined by an earlier instruction. Global ARGs are only
+        visible to ``FROM`` lines and to ARGs redeclared without a default
+        inside a stage, and stages built ``FROM`` an earlier stage's alias
+        inherit its ENV values. Skipped names are never substituted.
+        Returns each scope's variables, each layer's scope index, and the
+        resolved values of every ARG and ENV layer by position.
+        """
+        scope_definitions: List[List[Tuple[int, Definition]]] = [[]]
+        scope_bases: List[Optional[str]] = [None]
+        scope_aliases: List[Optional[str]] = [None]
+        layer_scopes: List[int] = []
+
+        for position, layer in enumerate(self._layers):
+            if layer.layer_type == "stage":
+                scope_definitions.append([])
+                scope_bases.append(layer.base)
+                scope_aliases.append(layer.alias)
+
+                # FROM lines only see global ARGs.
+                layer_scopes.append(0)
+                continue
+
+            layer_scopes.append(len(scope_definitions) - 1)
+
+            if layer.layer_type == "arg":
+                default = None if layer.default is None else str(layer.default)
+                scope_definitions[-1].append(
+                    (position, Definition("arg", layer.name, default, position))
+                )
+
+            elif layer.layer_type == "env":
+                scope_definitions[-1].extend(
+                    (position, Definition("env", key, str(value), position))
+                    for key, value in zip(layer.keys, layer.values)
+                )
+
+        scopes: List[Dict[str, Any]] = []
+        stage_envs: Dict[str, Dict[str, Any]] = {}
+        layer_values: Dict[int, List[Optional[str]]] = defaultdict(list)
+
+        for scope_idx, definitions in enumerate(scope_definitions):
+            inherited = stage_envs.get(scope_bases[scope_idx], {})
+
+            values, resolved = resolve_definitions(
+                [definition for _, definition in definitions],
+                inherited=inherited,
+                globals=scopes[0] if scopes else {},
+                overrides=defaults,
+                skip=skip,
+            )
+
+            env = dict(inherited)
+            for (position, definition), value in zip(definitions, values):
+                layer_values[position].append(value)
+
+                if definition.kind == "env":
+                    env[definition.name] = value
+
+            if alias := scope_aliases[scope_idx]:
+                stage_envs[alias] = env
+
+            scopes.append(resolved)
+
+        return scopes, layer_scopes, layer_values
+
+    def _resolve_layer(
+        self,
+        layer: (
             Add
-            | Arg
             | Cmd
             | Copy
             | Entrypoint
-            | Env
             | Expose
             | Healthcheck
             | Label
@@ -409,80 +769,41 @@ class Image:
             | User
             | Volume
             | Workdir
-        ] = []
-
-        for layer in image:
-            if not isinstance(layer, (Arg, Env)):
-                layer = self._resolve_layer(layer, resolved_args)
-
-            resolved_layers.append(layer)
-
-        image.from_layers(resolved_layers)
-
-        return image
-
-    def get_resolved_args(self):
-        arg_values: Dict[str, Any] = {}
-        arg_layers = self.layers(layer_types="arg")
-        for arg in arg_layers:
-            arg_name = re.sub(self._variable_clean_pattern, "", arg.name)
-
-            if (
-                arg_values.get(arg_name) is None
-                and arg.default
-                and (not re.search(self._variable_template_pattern, arg.default))
-            ):
-                arg_values[arg_name] = arg.default
-
-        resolved_args: Dict[str, Any] = {}
-        for arg_name in arg_values:
-            resolved_args[arg_name] = self._reduce_args(arg_name, arg_values)
-
-        for arg_name, value in resolved_args.items():
-            for match in re.finditer(self._variable_template_pattern, value or ""):
-                arg_value: str | None = None
-                if arg_variable := re.search(
-                    self._variable_resolved_name_pattern, match.group(0)
-                ):
-                    arg_value = resolved_args.get(arg_variable.group(0))
-
-                if arg_value:
-                    value = re.sub(match.group(0), arg_value, value)
-
-                resolved_args[arg_name] = value
-
-        env_values: Dict[str, Any] = {}
-        env_layers = self.layers(layer_types="env")
-        for env in env_layers:
-            for key, value in zip(env.keys, env.values):
-                if env_values.get(key) and isinstance(value, str):
-                    for match in re.finditer(self._variable_template_pattern, value):
-                        arg_value: str | None = None
-                        if envar_variable := re.search(
-                            self._variable_resolved_name_pattern, match.group(0)
-                        ):
-                            arg_value = resolved_args.get(envar_variable.group(0))
-
-                        if arg_value:
-                            value = arg_value
+        ),
+        resolved_args: Dict[str, Any],
+    ):
+        # Templates are compiled once per distinct string and cached, so
+        # each field is substituted in a single pass.
+        updates: Dict[str, Any] = {}
+        for field, field_value in layer:
+            if isinstance(field_value, str):
+                value = compile_template(field_value).render(resolved_args)
 
-                if not re.search(self._variable_template_pattern, value):
-                    env_values[key] = value
+                if value != field_value:
+                    updates[field] = value
 
-        resolved_args.update(env_values)
+            elif isinstance(field_value, (list, tuple)):
+                values = [
+                    compile_template(value).render(resolved_args)
+                    if isinstance(value, str)
+                    else value
+                    for value in field_value
+                ]
 
-        for arg_name, value in resolved_args.items():
-            resolved_args.update(self._resolve_args(arg_name, value, resolved_args))
+                if values != list(field_value):
+                    updates[field] = values
 
-        return resolved_args
+        return self._replace_layer(layer, updates)
 
-    def _resolve_layer(
+    def _replace_layer(
         self,
         layer: (
             Add
+            | Arg
             | Cmd
             | Copy
             | Entrypoint
+            | Env
             | Expose
             | Healthcheck
             | Label
@@ -495,145 +816,335 @@ class Image:
             | User
             | Volume
             | Workdir
+            | CompactLayer
         ),
-        resolved_args: Dict[str, Any],
+        updates: Dict[str, Any],
     ):
-        model_data = layer.model_dump()
-        for field, field_value in model_data.items():
-            if isinstance(field_value, str):
-                matches: Set[str] = set()
-                for match in re.finditer(self._variable_template_pattern, field_value):
-                    if resolved_name := re.search(
-                        self._variable_resolved_name_pattern, match.group(0)
-                    ):
-                        matches.add((resolved_name.group(0), match.group(0)))
-
-                matches = list(matches)
-
-                for resolved_name, match in matches:
-                    if resolved_value := resolved_args.get(resolved_name):
-                        field_value = re.sub(
-                            r"\$\{"
-                            + f"{resolved_name}?"
-                            + r"\}|\$"
-                            + f"{resolved_name}",
-                            resolved_value,
-                            field_value,
-                        )
-
-                model_data[field] = field_value
-
-            elif isinstance(field_value, list):
-                for idx, value in enumerate(field_value):
-                    if isinstance(value, str):
-                        matches: Set[str] = set()
-                        for match in re.finditer(
-                            self._variable_template_pattern, value
-                        ):
-                            if resolved_name := re.search(
-                                self._variable_resolved_name_pattern, match.group(0)
-                            ):
-                                matches.add((resolved_name.group(0), match.group(0)))
-
-                        matches = list(matches)
-
-                        for resolved_name, match in matches:
-                            if resolved_value := resolved_args.get(resolved_name):
-                                value = re.sub(
-                                    r"\$\{"
-                                    + f"{resolved_name}?"
-                                    + r"\}|\$"
-                                    + f"{resolved_name}",
-                                    resolved_value,
-                                    value,
-                                )
-
-                        model_data[field][idx] = value
-
-        return layer.model_copy(update=model_data)
-
-    def _reduce_args(self, arg_name: str, args: Dict[str, Any]):
-        arg_value = args.get(arg_name)
-
-        if arg_value in args:
-            return self._reduce_args(arg_value, args)
-
-        return arg_value
-
-    def _resolve_args(self, arg_name: str, value: str, resolved: Dict[str, str]):
-        if value is None:
-            return resolved
-
-        resolved_items = [
-            (resolved_name, resolved_value)
-            for resolved_name, resolved_value in resolved.items()
-            if resolved_value and resolved_value != value
-        ]
+        if isinstance(layer, CompactLayer):
+            return layer.model_copy(update=updates)
 
-        for resolved_arg, resolved_value in resolved_items:
-            for match in re.finditer(r"(\$)([\w]+)", resolved_value):
-                match_key = re.sub(r"\$|", "", match.group(0))
+        return replace(layer, updates)
 
-                if arg_name == match_key:
-                    resolved[resolved_arg] = resolved_value.replace(
-                        match.group(0), value
-                    )
+    def iter_lines(self) -> Iterator[str]:
+        """
+        Lazily renders the Dockerfile, yielding each instruction and the
+        blank-line separators between them as individual chunks.
+        """
+        separator = ""
 
-            for match in re.finditer(r"(\$\{)([\w]+)(\})", resolved_value):
-                match_key = re.sub(self._variable_clean_pattern, "", match.group(0))
+        for layer in self._layers:
+            if separator:
+                yield separator
 
-                if arg_name == match_key:
-                    resolved[resolved_arg] = resolved_value.replace(
-                        match.group(0), value
-                    )
+            yield layer.to_string().strip("\n")
+            separator = "\n\n"
 
-        return resolved
+    def write_to(
+        self,
+        output: TextIO | BinaryIO | socket.socket,
+        encoding: str = "utf-8",
+    ) -> int:
+        """
+        Streams the rendered Dockerfile into a text or binary file object,
+        or a socket, one instruction at a time, returning the number of
+        characters (text) or bytes (binary, socket) written.
+        """
+        if isinstance(output, socket.socket):
+            write = output.sendall
+            binary = True
+
+        else:
+            write = output.write
+            binary = not isinstance(output, io.TextIOBase)
+
+        written = 0
+        for chunk in self.iter_lines():
+            if binary:
+                chunk = chunk.encode(encoding)
+
+            write(chunk)
+            written += len(chunk)
+
+        return written
 
     def to_string(self) -> str:
-        return "\n\n".join([layer.to_string().strip("\n") for layer in self._layers])
+        return "".join(self.iter_lines())
 
-    def to_context(self) -> MemoryFile:
-        if os.path.exists(self.filename) is False:
-            self.to_file()
+    def to_context(
+        self,
+        output: Optional[BinaryIO | socket.socket] = None,
+        chunk_size: int = 1024 * 1024,
+        spool_size: int = 32 * 1024 * 1024,
+        backend: Literal["spooled", "memfd", "memory"] = "spooled",
+        context_path: Optional[str] = None,
+        reproducible: bool = False,
+        cache: Optional[ContextCache] = None,
+        deduplicate: bool = True,
+        hasher: Optional[FileHasher] = None,
+    ) -> SpooledMemoryFile | MemfdFile | MemoryFile | BinaryIO | socket.socket:
+        """
+        Builds the image's build context tar, streaming it into ``output``
+        or buffering it in ``backend``, and returns the sink.
+        """
+        if cache is not None:
+            if context_path is None:
+                raise ValueError("A context_path is required to cache a build context")
+
+            context_files = sorted(
+                self.context_files(context_path),
+                key=lambda file: file[1],
+            )
 
-        image_file = MemoryFile(self.to_string().encode(), name=self.filename)
+            key = cache.key(
+                self.to_string(),
+                context_files,
+                dockerfile_name=os.path.basename(self.filename),
+                deduplicate=deduplicate,
+            )
 
-        image_file.seek(0)
+            cached = cache.open(key)
+            if cached is None:
+                cached = cache.store(
+                    key,
+                    lambda tar_file: self._write_context(
+                        tar_file,
+                        context_files,
+                        chunk_size=chunk_size,
+                        reproducible=True,
+                        deduplicate=deduplicate,
+                        hasher=cache.hasher,
+                    ),
+                )
+
+            cached_context, self.context_digest = cached
+
+            if output is None:
+                return cached_context
 
-        tar_file_number = image_file.file_number + 1
+            with cached_context:
+                if isinstance(output, socket.socket):
+                    output.sendfile(cached_context)
 
-        tar_file = MemoryFile(b"", file_number=tar_file_number)
+                else:
+                    shutil.copyfileobj(cached_context, output, chunk_size)
 
-        context = tarfile.open(fileobj=tar_file, mode="w")
+            return output
 
-        image_file_info = context.gettarinfo(fileobj=image_file)
+        sink = output
+        if sink is None:
+            sink = self._create_context_buffer(backend, spool_size)
 
-        context.addfile(image_file_info, image_file)
+        if context_path is None:
+            context_files = self._flat_context_files()
+
+        else:
+            context_files = self.context_files(context_path)
+
+        if reproducible:
+            context_files = sorted(context_files, key=lambda file: file[1])
+
+        self.context_digest = self._write_context(
+            sink,
+            context_files,
+            chunk_size=chunk_size,
+            reproducible=reproducible,
+            deduplicate=deduplicate,
+            hasher=hasher,
+        )
+
+        if output is None:
+            sink.seek(0)
+
+        return sink
+
+    def _flat_context_files(self) -> Iterator[Tuple[str, str]]:
+        seen: Set[str] = {normalize_path(os.path.relpath(self.filename))}
 
         for file in self.files:
-            filename = pathlib.Path(file).name
+            arcname = os.path.relpath(file)
+
+            # Files outside the working directory keep their absolute
+            # layout so they cannot collide with relative ones.
+            if arcname == ".." or arcname.startswith(f"..{os.sep}"):
+                arcname = os.path.abspath(file)
+
+            arcname = normalize_path(arcname)
 
-            with open(file, "rb") as context_file:
-                info = context.gettarinfo(fileobj=context_file, arcname=filename)
+            if arcname not in seen:
+                seen.add(arcname)
+                yield file, arcname
 
-                context.addfile(info, context_file)
+    def _write_context(
+        self,
+        sink: BinaryIO | socket.socket,
+        context_files: Iterable[Tuple[str, str]],
+        chunk_size: int = 1024 * 1024,
+        reproducible: bool = False,
+        deduplicate: bool = True,
+        hasher: Optional[FileHasher] = None,
+    ) -> Optional[str]:
+        with ContextWriter(
+            sink,
+            chunk_size=chunk_size,
+            reproducible=reproducible,
+            deduplicate=deduplicate,
+            hasher=hasher,
+        ) as context:
+            context.add_lines(
+                os.path.basename(self.filename),
+                self.iter_lines(),
+            )
+
+            for file, arcname in context_files:
+                context.add_path(file, arcname=arcname)
 
-        context.close()
-        tar_file.seek(0)
+        return context.digest
 
-        return tar_file
+    def context_digests(
+        self,
+        context_path: str = ".",
+        hasher: Optional[FileHasher] = None,
+    ) -> Dict[str, str]:
+        """
+        Hashes every context file referenced by the image's COPY/ADD
+        sources in parallel, returning BLAKE2 digests keyed by arcname.
+        Files whose stat matches the hasher's cache are not re-read.
+        """
+        if hasher is None:
+            hasher = FileHasher()
+
+        context_files = list(self.context_files(context_path))
+        digests = hasher.hash_files([path for path, _ in context_files])
+
+        return {arcname: digests[path] for path, arcname in context_files}
+
+    def context_changed(
+        self,
+        cache: ContextCache,
+        context_path: str = ".",
+        deduplicate: bool = True,
+    ) -> bool:
+        """
+        Returns False if ``cache`` already holds this image's context for
+        ``context_path``. Only files whose stat changed are re-hashed.
+        """
+        key = cache.key(
+            self.to_string(),
+            sorted(self.context_files(context_path), key=lambda file: file[1]),
+            dockerfile_name=os.path.basename(self.filename),
+            deduplicate=deduplicate,
+        )
 
-    def to_file(self, filepath: Optional[str] = None):
+        return not cache.contains(key)
+
+    def _create_context_buffer(
+        self,
+        backend: Literal["spooled", "memfd", "memory"],
+        spool_size: int,
+    ) -> SpooledMemoryFile | MemfdFile | MemoryFile:
+        if backend == "memfd" and MemfdFile.is_supported():
+            stub = self.name.replace("/", ".")
+            return MemfdFile(name=f"dcrx-context-{stub}")
+
+        elif backend in ("memfd", "memory"):
+            return MemoryFile(b"", file_number=1)
+
+        return SpooledMemoryFile(max_size=spool_size)
+
+    def context_files(self, context_path: str = ".") -> Iterator[Tuple[str, str]]:
+        """
+        Lazily walks the files referenced by the image's COPY/ADD sources
+        under ``context_path``, yielding ``(path, arcname)`` pairs for
+        everything its ``.dockerignore`` does not exclude.
+        """
+        return walk_sources(
+            context_path,
+            self._context_sources(),
+            DockerIgnore.from_file(os.path.join(context_path, ".dockerignore")),
+        )
+
+    def to_dockerignore(
+        self,
+        filepath: Optional[str] = None,
+        writer: Optional[AtomicWriter] = None,
+    ) -> str:
+        """
+        Renders an allowlist-style ``.dockerignore`` that excludes everything
+        (``*``) and then re-includes only the paths referenced by COPY/ADD
+        sources across every stage, ignoring ``COPY --from`` and remote ADD
+        sources. If ``filepath`` is given the result is also written there,
+        only when its content changed.
+        """
+        entries = {normalize_path(source) for source in self._context_sources()}
+
+        # Copying the whole context leaves nothing to exclude.
+        if "" in entries:
+            dockerignore = ""
+
+        else:
+            dockerignore = "\n".join(
+                ["*", *[f"!{entry}" for entry in sorted(entries)]]
+            )
+
+            dockerignore = f"{dockerignore}\n"
+
+        if filepath is not None:
+            if writer is None:
+                writer = AtomicWriter()
+
+            writer.write(filepath, dockerignore.encode())
+
+        return dockerignore
+
+    def _context_sources(self) -> List[str]:
+        # Sources are read through the resolved view so ARG/ENV references
+        # name the files the builder will actually copy.
+        resolved = self.resolved()
+        sources: List[str] = []
+
+        positions = sorted(
+            [*self._layer_index.get("copy", []), *self._layer_index.get("add", [])]
+        )
+
+        for position in positions:
+            layer = resolved[position]
+
+            if layer.layer_type == "copy" and layer.from_layer:
+                continue
+
+            if layer.layer_type == "add" and _remote_source_pattern.match(
+                layer.source
+            ):
+                continue
+
+            sources.extend(tokenize(str(layer.source)))
+
+        return sources
+
+    def to_file(
+        self,
+        filepath: Optional[str] = None,
+        writer: Optional[AtomicWriter] = None,
+    ) -> bool:
+        """
+        Atomically writes the rendered Dockerfile, skipping the write when
+        the file already holds identical content. Returns whether the file
+        was changed. Pass a shared, batching ``writer`` when writing many
+        images and call its ``sync()`` once done.
+        """
         if filepath is None:
             filepath = self.filename
 
         elif filepath != self.filename:
             self.filename = filepath
 
-        self.files.append(filepath)
+        if filepath not in self.files:
+            self.files.append(filepath)
 
-        with open(filepath, "w") as dockerfile:
-            dockerfile.write(self.to_string())
+        if writer is None:
+            writer = AtomicWriter()
+
+        return writer.write(filepath, self.to_string().encode())
 
     def to_memory_file(self, filepath: Optional[str] = None):
         if filepath is None:
@@ -645,12 +1156,13 @@ class Image:
         self.files.append(filepath)
 
         with open(filepath, "w") as dockerfile:
-            dockerfile.write(self.to_string())
+            self.write_to(dockerfile)
 
     def clear(self):
         if os.path.exists(self.filename):
             os.remove(self.filename)
             self._layers.clear()
+            self._layer_index.clear()
 
     def add(
         self,
@@ -662,7 +1174,7 @@ class Image:
         checksum: Optional[str] = None,
         link: bool = False,
     ):
-        self._layers.append(
+        self._append_layer(
             Add(
                 source=source,
                 destination=destination,
@@ -677,12 +1189,12 @@ class Image:
         return self
 
     def arg(self, name: str, default: Union[str, int, bool, float]):
-        self._layers.append(Arg(name=name, default=default))
+        self._append_layer(Arg(name=name, default=default))
 
         return self
 
     def cmd(self, command: List[Union[str, int, bool, float]]):
-        self._layers.append(Cmd(command=command))
+        self._append_layer(Cmd(command=command))
 
         return self
 
@@ -706,14 +1218,14 @@ class Image:
             link=link,
         )
 
-        self._layers.append(copy_layer)
+        self._append_layer(copy_layer)
 
         self.files.append(f"./{copy_layer.source}")
 
         return self
 
     def entrypoint(self, command: List[str]):
-        self._layers.append(Entrypoint(command=command))
+        self._append_layer(Entrypoint(command=command))
 
         return self
 
@@ -728,10 +1240,10 @@ class Image:
             keys = [keys]
             values = [values]
 
-        self._layers.append(Env(keys=keys, values=values))
+        self._append_layer(Env(keys=keys, values=values))
 
     def expose(self, ports: List[int]):
-        self._layers.append(Expose(ports=ports))
+        self._append_layer(Expose(ports=ports))
 
         return self
 
@@ -743,7 +1255,7 @@ class Image:
         retries: int,
         command: List[Union[str, int, bool, float]],
     ):
-        self._layers.append(
+        self._append_layer(
             Healthcheck(
                 interval=interval,
                 timeout=timeout,
@@ -756,12 +1268,12 @@ class Image:
         return self
 
     def label(self, name: str, value: str):
-        self._layers.append(Label(name=name, value=value))
+        self._append_layer(Label(name=name, value=value))
 
         return self
 
     def maintainer(self, author: str):
-        self._layers.append(Maintainer(author=author))
+        self._append_layer(Maintainer(author=author))
 
         return self
 
@@ -785,7 +1297,7 @@ class Image:
             | Workdir
         ),
     ):
-        self._layers.append(OnBuild(instruction=instruction))
+        self._append_layer(OnBuild(instruction=instruction))
 
         return self
 
@@ -808,7 +1320,7 @@ class Image:
             mount_type_name = mount.get("mount_type", "bind")
             mount_type = self._mount_types.get(mount_type_name)(mount)
 
-        self._layers.append(
+        self._append_layer(
             Run(command=command, mount=mount_type, network=network, security=security)
         )
 
@@ -817,7 +1329,7 @@ class Image:
     def shell(
         self, executable: str, parameters: Optional[List[str | int | float | bool]]
     ):
-        self._layers.append(Shell(executable=executable, parameters=parameters))
+        self._append_layer(Shell(executable=executable, parameters=parameters))
 
         return self
 
@@ -828,26 +1340,26 @@ class Image:
         alias: str | None = None,
         platform: str | None = None,
     ):
-        self._layers.append(Stage(base=base, tag=tag, alias=alias, platform=platform))
+        self._append_layer(Stage(base=base, tag=tag, alias=alias, platform=platform))
 
         return self
 
     def stopsignal(self, signal: int):
-        self._layers.append(StopSignal(signal=signal))
+        self._append_layer(StopSignal(signal=signal))
 
         return self
 
     def user(self, user_id: str, group_id: Optional[str] = None):
-        self._layers.append(User(user_id=user_id, group_id=group_id))
+        self._append_layer(User(user_id=user_id, group_id=group_id))
 
         return self
 
     def volume(self, paths: List[str]):
-        self._layers.append(Volume(paths=paths))
+        self._append_layer(Volume(paths=paths))
 
         return self
 
     def workdir(self, path: str):
-        self._layers.append(Workdir(path=path))
+        self._append_layer(Workdir(path=path))
 
         return self
@@ -1,4 +1,3 @@
-import re
 from pydantic import (
     BaseModel,
     StrictStr,
@@ -6,9 +5,14 @@ from pydantic import (
     constr
 )
 
-from typing import Literal, Optional, Dict, List, Any
-from .arg import Arg
-from .env import Env
+from typing import Literal, Optional, Dict
+from .tokenizer import (
+    parse_flags,
+    parse_json_array,
+    quote,
+    strip_keyword,
+    tokenize
+)
 
 
 class Add(BaseModel):
@@ -22,24 +26,26 @@ class Add(BaseModel):
     link: StrictBool=False
 
     def to_string(self) -> str:
-        add_string = 'ADD'
+        add_args = ['ADD']
 
         if self.user_id and self.group_id:
-            add_string = f'{add_string} --chown={self.user_id}:{self.group_id}'
+            add_args.append(f'--chown={self.user_id}:{self.group_id}')
         
         elif self.user_id:
-            add_string = f'{add_string} --chown={self.user_id}'
+            add_args.append(f'--chown={self.user_id}')
 
         if self.permissions:
-            add_string = f'{add_string} --chmod={self.permissions}'
+            add_args.append(f'--chmod={self.permissions}')
         
         if self.checksum:
-            add_string = f'{add_string} --checksum={self.checksum}'
+            add_args.append(f'--checksum={self.checksum}')
 
         if self.link:
-            add_string = f'{add_string} --link'
+            add_args.append('--link')
+
+        add_args.append(f'{self.source} {self.destination}')
 
-        return f'{add_string} {self.source} {self.destination}'
+        return ' '.join(add_args)
     
     @classmethod
     def parse(
@@ -47,58 +53,36 @@ class Add(BaseModel):
         line: str,
     ):
         
-        line = re.sub('ADD ', '', line, count=1).strip()
-        tokens = line.strip('\n').split(' ')
+        flags, args = parse_flags(
+            strip_keyword(line, 'ADD')
+        )
 
         options: Dict[str, str | bool | int] = {}
-        remainders = []
-
-        for token in tokens:
-            if re.search(
-                '--link',
-                token
-            ):
-                options['link'] = True
-
-            elif re.search(
-                '--checksum',
-                token
-            ):
-                options['checksum'] = re.sub(
-                    '--checksum=',
-                    '',
-                    token
-                )
-
-            elif re.search(
-                '--chown',
-                token
-            ):
-                token = re.sub(
-                    '--checksum=',
-                    '',
-                    token
-                )
-                
-                (
-                    user_id,
-                    group_id,
-                    permissions
-                ) = cls._match_permissions(token)
-
-                options['user_id'] = user_id
-                options['group_id'] = group_id
-                options['permissions'] = permissions
-
-            else:
-                remainders.append(token)
-
-        if len(remainders) > 2:
-            destination = remainders.pop()
-            source = ' '.join(remainders)
-
-        else:
-            source, destination = remainders[0], remainders[1]
+
+        if 'link' in flags:
+            options['link'] = True
+
+        if checksum := flags.get('checksum'):
+            options['checksum'] = checksum
+
+        if chmod := flags.get('chmod'):
+            options['permissions'] = chmod
+
+        if chown := flags.get('chown'):
+            (
+                user_id,
+                group_id
+            ) = cls._match_permissions(chown)
+
+            options['user_id'] = user_id
+            options['group_id'] = group_id
+
+        remainders = parse_json_array(args)
+        if remainders is None:
+            remainders = tokenize(args)
+
+        destination = remainders.pop()
+        source = ' '.join(quote(remainder) for remainder in remainders)
 
         return Add(
             source=source,
@@ -111,32 +95,9 @@ class Add(BaseModel):
         cls,
         token: str
     ):
-        if permissions := re.search(
-            r'[0-7]{4}|[0-7]{3}',
-            token
-        ):
-            return (
-                None,
-                None,
-                permissions.group(0)
-            )
-        
-        elif ':' in token:
-            user_id, group_id = token.split(':')
-
-            return (
-                user_id,
-                group_id,
-                None
-            )
-        
-        else:
-            return (
-                token,
-                None,
-                None
-            )
-
-                  
-
+        user_id, _, group_id = token.partition(':')
 
+        return (
+            user_id,
+            group_id or None
+        )
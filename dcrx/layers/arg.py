@@ -1,4 +1,3 @@
-import re
 from pydantic import (
     BaseModel,
     StrictStr,
@@ -7,6 +6,7 @@ from pydantic import (
     StrictFloat
 )
 from typing import Union, Optional, Literal, Dict
+from .tokenizer import strip_keyword, unquote
 
 
 class Arg(BaseModel):
@@ -31,23 +31,19 @@ class Arg(BaseModel):
         line: str
     ):
         
-        line = re.sub('ARG ', '', line, count=1)
-        token = line.strip()
+        token = strip_keyword(line, 'ARG')
 
         options: Dict[
             str,
             str | int | float | bool
         ] = {}
 
-        if '=' in token:
-            name, default = token.split('=')
+        name, has_default, default = token.partition('=')
+        options['name'] = name.strip()
 
-            options['name'] = name
-            options['default'] = default
-
-        else:
-            options['name'] = token
+        if has_default:
+            options['default'] = unquote(default.strip())
 
         return Arg(
             **options
-        )
\ No newline at end of file
+        )
@@ -1,4 +1,3 @@
-import re
 from pydantic import (
     BaseModel,
     StrictStr,
@@ -7,7 +6,12 @@ from pydantic import (
     StrictFloat
 )
 
-from typing import List, Union, Literal, Dict
+from typing import List, Union, Literal
+from .tokenizer import (
+    parse_json_array,
+    strip_keyword,
+    unquote
+)
 
 
 class Cmd(BaseModel):
@@ -32,15 +36,14 @@ class Cmd(BaseModel):
         line: str
     ):
         
-        line = re.sub('CMD ', '', line, count=1).strip()
-        command = [
-            arg.strip() for arg in re.sub(
-                r'\[|\]', 
-                '', 
-                line
-            ).split(',')
-        ]
+        args = strip_keyword(line, 'CMD')
+
+        command = parse_json_array(args)
+        if command is None:
+            command = [
+                unquote(arg.strip()) for arg in args.strip('[]').split(',')
+            ]
 
         return Cmd(
             command=command
-        )
\ No newline at end of file
+        )
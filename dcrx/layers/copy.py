@@ -1,8 +1,9 @@
-import re
 from typing import Dict, Literal, Optional, Union
 
 from pydantic import BaseModel, DirectoryPath, FilePath, StrictBool, StrictStr, constr
 
+from .tokenizer import parse_flags, parse_json_array, quote, strip_keyword, tokenize
+
 
 class Copy(BaseModel):
     layer_type: Literal["copy"] = "copy"
@@ -15,76 +16,62 @@ class Copy(BaseModel):
     link: StrictBool = False
 
     def to_string(self) -> str:
-        copy_string = "COPY"
+        copy_args = ["COPY"]
 
         if self.user_id and self.group_id:
-            copy_string = f"{copy_string} --chown={self.user_id}:{self.group_id}"
+            copy_args.append(f"--chown={self.user_id}:{self.group_id}")
 
         elif self.user_id:
-            copy_string = f"{copy_string} --chown={self.user_id}"
+            copy_args.append(f"--chown={self.user_id}")
 
         if self.permissions:
-            copy_string = f"{copy_string} --chmod={self.permissions}"
+            copy_args.append(f"--chmod={self.permissions}")
 
         if self.from_layer:
-            copy_string = f"{copy_string} --from={self.from_layer}"
+            copy_args.append(f"--from={self.from_layer}")
 
         if self.link:
-            copy_string = f"{copy_string} --link"
+            copy_args.append("--link")
+
+        copy_args.append(f"./{self.source} {self.destination}")
 
-        return f"{copy_string} ./{self.source} {self.destination}"
+        return " ".join(copy_args)
 
     @classmethod
     def parse(
         cls,
         line: str,
     ):
-        line = re.sub("COPY ", "", line, count=1).strip()
-        tokens = line.strip("\n").split(" ")
+        flags, args = parse_flags(strip_keyword(line, "COPY"))
 
         options: Dict[str, str | bool | int] = {}
-        remainders = []
-
-        for token in tokens:
-            if re.search(r"--link", token):
-                options["link"] = True
 
-            elif re.search(r"--checksum", token):
-                options["checksum"] = re.sub(r"--checksum=", "", token)
+        if "link" in flags:
+            options["link"] = True
 
-            elif re.search(r"--from", token):
-                options["from_layer"] = re.sub(r"--from=", "", token)
+        if from_layer := flags.get("from"):
+            options["from_layer"] = from_layer
 
-            elif re.search(r"--chown", token):
-                token = re.sub(r"--checksum=", "", token)
+        if chmod := flags.get("chmod"):
+            options["permissions"] = chmod
 
-                (user_id, group_id, permissions) = cls._match_permissions(token)
+        if chown := flags.get("chown"):
+            (user_id, group_id) = cls._match_permissions(chown)
 
-                options["user_id"] = user_id
-                options["group_id"] = group_id
-                options["permissions"] = permissions
+            options["user_id"] = user_id
+            options["group_id"] = group_id
 
-            else:
-                remainders.append(token)
+        remainders = parse_json_array(args)
+        if remainders is None:
+            remainders = tokenize(args)
 
-        if len(remainders) > 2:
-            destination = remainders.pop()
-            source = " ".join(remainders)
-
-        else:
-            source, destination = remainders[0], remainders[1]
+        destination = remainders.pop()
+        source = " ".join(quote(remainder) for remainder in remainders)
 
         return Copy(source=source, destination=destination, **options)
 
     @classmethod
     def _match_permissions(cls, token: str):
-        if permissions := re.search(r"[0-7]{4}|[0-7]{3}", token):
-            return (None, None, permissions.group(0))
-
-        elif ":" in token:
-            user_id, group_id = token.split(":")
-
-            return (user_id, group_id, None)
+        user_id, _, group_id = token.partition(":")
 
-        else:
-            return (token, None, None)
+        return (user_id, group_id or None)
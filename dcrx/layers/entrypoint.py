@@ -1,10 +1,14 @@
-import re
 from pydantic import (
     BaseModel,
     StrictStr
 )
 
 from typing import List, Literal
+from .tokenizer import (
+    parse_json_array,
+    strip_keyword,
+    unquote
+)
 
 
 class Entrypoint(BaseModel):
@@ -24,15 +28,14 @@ class Entrypoint(BaseModel):
         line: str
     ):
         
-        line = re.sub('ENTRYPOINT ', '', line, count=1).strip()
-        command = [
-            arg.strip() for arg in re.sub(
-                r'\[|\]', 
-                '', 
-                line
-            ).split(',')
-        ]
+        args = strip_keyword(line, 'ENTRYPOINT')
+
+        command = parse_json_array(args)
+        if command is None:
+            command = [
+                unquote(arg.strip()) for arg in args.strip('[]').split(',')
+            ]
 
         return Entrypoint(
             command=command
-        )
\ No newline at end of file
+        )
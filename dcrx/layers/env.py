@@ -1,4 +1,3 @@
-import re
 from pydantic import (
     BaseModel,
     StrictStr,
@@ -7,6 +6,7 @@ from pydantic import (
     StrictFloat
 )
 from typing import Union, Literal, List
+from .tokenizer import strip_keyword, tokenize, unquote
 
 
 class Env(BaseModel):
@@ -34,57 +34,33 @@ class Env(BaseModel):
         line: str
     ):
         
-        line = re.sub('ENV ', '', line, count=1).strip()
-
-        tokens = [
-            token.strip(
-                '\\'
-            ).strip() for token in line.split() if len(token) > 0
-        ]
+        args = strip_keyword(line, 'ENV')
+        tokens = tokenize(args)
 
         keys: List[str] = []
         values: List[str] = []
 
-        last_name: str = None
-
-        for token in tokens:
-
-            key, value = None, None
-            
-            if '=' in token:
-                key, value = token.split('=')
-
-            else:
-
-                if len(token.split()) != 2 and last_name is None and len(token) > 0:
-                    last_name = token.strip()
-
-                
-                elif len(token.split()) != 2 and last_name and len(token) > 0:
-                    key = last_name
-                    value = token.strip()
-                    last_name = None
-
-                else:
-
-                    try:
-
-                        key, value = token.split()
-
-                    except Exception:
-                        pass
+        if len(tokens) > 0 and '=' not in tokens[0]:
+            # Legacy ENV <key> <value> form, where the value is the rest
+            # of the line.
+            key, _, value = args.partition(' ')
 
-            if key and value:
-                keys.append(
-                    key.strip()
-                )
+            keys.append(key)
+            values.append(
+                unquote(value.strip())
+            )
 
-                values.append(
-                    value.strip()
-                )
+        else:
+            for token in tokens:
+                key, _, value = token.partition('=')
 
+                if key:
+                    keys.append(key)
+                    values.append(
+                        unquote(value)
+                    )
 
         return Env(
             keys=keys,
             values=values
-        )
\ No newline at end of file
+        )
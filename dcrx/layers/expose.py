@@ -1,4 +1,3 @@
-import re
 from pydantic import (
     BaseModel,
     StrictInt,
@@ -7,6 +6,7 @@ from pydantic import (
 )
 
 from typing import Literal, List
+from .tokenizer import strip_keyword
 
 
 class Expose(BaseModel):
@@ -24,27 +24,11 @@ class Expose(BaseModel):
         cls,
         line: str
     ):
-        line = re.sub('EXPOSE ', '', line, count=1).strip()
-        ports: List[str] = []
-
-        tokens = line.split(' ')
-
-        for token in tokens:
-            if port := re.search(
-                r'[0-9]{*}',
-                token
-            ):
-                ports.append(
-                    int(port.group(0))
-                )
-
-        if len(ports) < 1:
-            ports.append(
-                line
-            )
+        ports: List[int | str] = [
+            int(token) if token.isdigit() else token
+            for token in strip_keyword(line, 'EXPOSE').split()
+        ]
 
         return Expose(
             ports=ports
         )
-        
-        
\ No newline at end of file
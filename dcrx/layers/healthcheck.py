@@ -6,6 +6,18 @@ from pydantic import (
 )
 from typing import Literal, Dict, Optional, List
 from .cmd import Cmd
+from .tokenizer import parse_flags, strip_keyword
+
+
+_duration_pattern = re.compile(r'([0-9]*\.?[0-9]+)(ms|h|m|s)?')
+
+_duration_units: Dict[str, float] = {
+    'ms': 0.001,
+    's': 1,
+    'm': 60,
+    'h': 3600,
+    '': 1
+}
 
 
 class Healthcheck(BaseModel):
@@ -14,105 +26,81 @@ class Healthcheck(BaseModel):
     timeout: Optional[StrictInt| StrictFloat]=None
     start_period: Optional[StrictInt | StrictFloat]=None
     retries: Optional[StrictInt | StrictFloat]=None
-    command: Cmd
+    command: Optional[Cmd]=None
 
     def to_string(self) -> str:
+        if self.command is None:
+            return 'HEALTHCHECK NONE'
+
         command = self.command.to_string()
-        timings: List[str] = []
+        options: List[str] = ['HEALTHCHECK']
 
         if self.interval:
-            timings.append(
+            options.append(
                 f'--interval={self.interval}s'
             )
         
         if self.timeout:
-            timings.append(
+            options.append(
                 f'--timeout={self.timeout}s'
             )
 
         if self.start_period:
-            timings.append(
+            options.append(
                 f'--start-period={self.start_period}s'
             )
 
-        timings = ' '.join(timings)
+        if self.retries:
+            options.append(
+                f'--retries={self.retries}'
+            )
+
+        options.append(command)
 
-        return f'HEALTHCHECK {timings} --retries={self.retries} {command}'
+        return ' '.join(options)
     
     @classmethod
     def parse(
         cls,
         line: str
     ):
-        line = re.sub('ADD ', '', line, count=1)
+        flags, args = parse_flags(
+            strip_keyword(line, 'HEALTHCHECK')
+        )
 
-        options: Dict[str, int | Cmd] = {}
+        if args.upper() == 'NONE':
+            return Healthcheck()
 
-        if command := re.search(
-            r'CMD(.*)',
-            line
+        options: Dict[str, int | float | Cmd] = {
+            'command': Cmd.parse(args)
+        }
+
+        for flag, option in (
+            ('interval', 'interval'),
+            ('timeout', 'timeout'),
+            ('start-period', 'start_period'),
         ):
-            command_string = command.group(0)
-            options['command'] = Cmd.parse(command_string)
-            
-            line = re.sub(command_string, '', line)
+            if duration := flags.get(flag):
+                options[option] = cls._parse_duration(duration)
 
-        tokens = line.strip('\n').split(' ')
-        
-        for token in tokens:
-            if interval := re.search(
-                r'--interval=[0-9]*s',
-                token
-            ):
-                interval_amount = int(re.sub(
-                    r'[^0-9]',
-                    '', 
-                    interval.group(0)
-                ))
-
-                options['interval'] = interval_amount
-
-            elif timeout := re.search(
-                r'--timeout=[0-9]*s',
-                token
-            ):
-                timeout_amount = int(re.sub(
-                    r'[^0-9]',
-                    '', 
-                    timeout.group(0)
-                ))
-
-                options['timeout'] = timeout_amount
-                
-
-            elif start_period := re.search(
-                r'--timeout=[0-9]*s',
-                token
-            ):
-                start_period_amount = int(re.sub(
-                    r'[^0-9]',
-                    '', 
-                    start_period.group(0)
-                ))
-
-                options['start_period'] = start_period_amount
-
-            elif retries := re.search(
-                r'--retries=[0-9]*',
-                token
-            ):
-                
-                retries_amount = int(re.sub(
-                    r'[^0-9]',
-                    '', 
-                    retries.group(0)
-                ))
-
-                options['retries'] = retries_amount
+        if retries := flags.get('retries'):
+            options['retries'] = int(retries)
 
         return Healthcheck(
             **options
         )
-                
-                
 
+    @classmethod
+    def _parse_duration(
+        cls,
+        duration: str
+    ) -> int | float:
+        seconds = sum(
+            float(amount) * _duration_units[unit]
+            for amount, unit in _duration_pattern.findall(duration)
+        )
+
+        if seconds.is_integer():
+            return int(seconds)
+
+        return seconds
@@ -1,9 +1,9 @@
-import re
 from pydantic import (
     BaseModel,
     StrictStr,
 )
 from typing import Literal
+from .tokenizer import strip_keyword, tokenize, unquote
 
 
 class Label(BaseModel):
@@ -20,10 +20,13 @@ class Label(BaseModel):
         line: str
     ):
         
-        line = re.sub('LABEL ', '', line, count=1)
-        name, value = line.strip().split('=')
+        tokens = tokenize(
+            strip_keyword(line, 'LABEL')
+        )
+
+        name, _, value = tokens[0].partition('=')
 
         return Label(
             name=name,
-            value=value
-        )
\ No newline at end of file
+            value=unquote(value)
+        )
@@ -1,9 +1,9 @@
-import re
 from pydantic import (
     BaseModel,
     StrictStr
 )
 from typing import Literal
+from .tokenizer import strip_keyword
 
 
 class Maintainer(BaseModel):
@@ -19,9 +19,6 @@ class Maintainer(BaseModel):
         line: str
     ):
         
-        line = re.sub('MAINTAINER ', '', line, count=1)
-        author = line.strip()
-
         return Maintainer(
-            author=author
-        )
\ No newline at end of file
+            author=strip_keyword(line, 'MAINTAINER')
+        )
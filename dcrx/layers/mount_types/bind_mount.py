@@ -1,8 +1,9 @@
-import re
-from typing import Dict, Literal
+from typing import Dict, List, Literal, Optional, Tuple
 
 from pydantic import BaseModel, StrictBool, StrictStr
 
+from ..tokenizer import parse_bool, parse_key_values
+
 BindMountConfig = Dict[
     Literal[
         "mount_type",
@@ -26,6 +27,23 @@ BindMountConfig = Dict[
     | bool,
 ]
 
+_bind_mount_options: Dict[str, str] = {
+    "target": "target",
+    "dst": "target",
+    "destination": "target",
+    "source": "source",
+    "src": "source",
+    "from": "from_layer",
+    "bind-propagation": "bind_propagation",
+}
+
+_bind_mount_flags: Dict[str, str] = {
+    "readonly": "enable_readonly",
+    "ro": "enable_readonly",
+    "readwrite": "enable_readwrite",
+    "rw": "enable_readwrite",
+}
+
 
 class BindMount(BaseModel):
     mount_type: Literal["bind"] = "bind"
@@ -47,61 +65,35 @@ class BindMount(BaseModel):
     enable_readwrite: StrictBool | None = None
 
     def to_string(self) -> str:
-        mount_string = f"--mount=type={self.mount_type},target={self.target}"
+        mount_options = [f"--mount=type={self.mount_type}", f"target={self.target}"]
 
         if self.source:
-            mount_string = f"{mount_string},source={self.source}"
+            mount_options.append(f"source={self.source}")
 
         if self.from_layer:
-            mount_string = f"{mount_string},from={self.from_layer}"
+            mount_options.append(f"from={self.from_layer}")
 
         if self.enable_readonly:
-            mount_string = f"{mount_string},ro"
+            mount_options.append("ro")
 
         if self.enable_readwrite:
-            mount_string = f"{mount_string},rw"
+            mount_options.append("rw")
 
-        return mount_string
+        return ",".join(mount_options)
 
     @classmethod
     def parse(cls, line: str):
-        lines = line.split(" ")
-        options: BindMountConfig = {"mount_type": "bind"}
-
-        if "readwrite" in lines:
-            options["readwrite"] = True
-            lines.remove("readwrite")
-
-        elif "rw" in lines:
-            options["readwrite"] = True
-            lines.remove("rw")
-
-        tokens = line.split(",")
+        return cls.parse_options(parse_key_values(line))
 
-        for token in tokens:
-            if target := re.search(r"target=(.*)", token):
-                options["target"] = re.sub(r"target=", "", target.group(0))
-
-            elif source := re.search(r"source=(.*)", token):
-                options["source"] = re.sub(r"source=", "", source.group(0))
-
-            elif mount_from := re.search(r"from=(.*)", token):
-                options["from_layer"] = re.sub(r"from=", "", mount_from.group(0))
-
-            elif readonly := re.search(r"readonly=(.*)", token):
-                readonly_value = re.sub(r"readonly=", "", readonly.group(0))
-                options["enable_readonly"] = True if readonly_value == "true" else None
-
-            elif re.search(r"readonly", token) or re.search(r"ro", token):
-                options["enable_readonly"] = True
+    @classmethod
+    def parse_options(cls, mount_options: List[Tuple[str, Optional[str]]]):
+        options: BindMountConfig = {"mount_type": "bind"}
 
-            elif readwrite := re.search(r"readwrite=(.*)", token):
-                readwrite_value = re.sub(r"readwrite=", "", readwrite.group(0))
-                options["enable_readwrite"] = (
-                    True if readwrite_value == "true" else None
-                )
+        for key, value in mount_options:
+            if option := _bind_mount_options.get(key):
+                options[option] = value
 
-            elif re.search(r"readwrite", token) or re.search(r"rw", token):
-                options["enable_readwrite"] = True
+            elif flag := _bind_mount_flags.get(key):
+                options[flag] = parse_bool(value)
 
         return BindMount(**options)
@@ -1,8 +1,9 @@
-import re
-from typing import Dict, Literal
+from typing import Dict, List, Literal, Optional, Tuple
 
 from pydantic import BaseModel, StrictBool, StrictStr, constr
 
+from ..tokenizer import parse_bool, parse_key_values
+
 CacheMountConfig = Dict[
     Literal[
         "mount_type",
@@ -24,6 +25,27 @@ CacheMountConfig = Dict[
     | Literal[r"^[0-7]*$"],
 ]
 
+_cache_mount_options: Dict[str, str] = {
+    "id": "id",
+    "target": "target",
+    "dst": "target",
+    "destination": "target",
+    "source": "source",
+    "src": "source",
+    "from": "from_layer",
+    "sharing": "sharing",
+    "mode": "mode",
+    "uid": "user_id",
+    "gid": "group_id",
+}
+
+_cache_mount_flags: Dict[str, str] = {
+    "readonly": "enable_readonly",
+    "ro": "enable_readonly",
+    "readwrite": "enable_readwrite",
+    "rw": "enable_readwrite",
+}
+
 
 class CacheMount(BaseModel):
     mount_type: Literal["cache"] = "cache"
@@ -39,93 +61,50 @@ class CacheMount(BaseModel):
     group_id: StrictStr | None = None
 
     def to_string(self) -> str:
-        mount_string = f"--mount=type={self.mount_type},target={self.target}"
+        mount_options = [f"--mount=type={self.mount_type}", f"target={self.target}"]
 
         if self.id:
-            mount_string = f"{mount_string},id={self.id}"
+            mount_options.append(f"id={self.id}")
 
         if self.source:
-            mount_string = f"{mount_string},source={self.source}"
+            mount_options.append(f"source={self.source}")
 
         if self.from_layer:
-            mount_string = f"{mount_string},from={self.from_layer}"
+            mount_options.append(f"from={self.from_layer}")
 
         if self.enable_readonly:
-            mount_string = f"{mount_string},ro"
+            mount_options.append("ro")
 
         if self.enable_readwrite:
-            mount_string = f"{mount_string},rw"
+            mount_options.append("rw")
 
         if self.sharing:
-            mount_string = f"{mount_string},sharing={self.sharing}"
+            mount_options.append(f"sharing={self.sharing}")
 
         if self.mode:
-            mount_string = f"{mount_string},mode={self.mode}"
+            mount_options.append(f"mode={self.mode}")
 
         if self.user_id:
-            mount_string = f"{mount_string},uid={self.user_id}"
+            mount_options.append(f"uid={self.user_id}")
 
         if self.group_id:
-            mount_string = f"{mount_string},gid={self.group_id}"
+            mount_options.append(f"gid={self.group_id}")
 
-        return mount_string
+        return ",".join(mount_options)
 
     @classmethod
     def parse(cls, line: str):
-        lines = line.split(" ")
-        options: CacheMountConfig = {"mount_type": "cache"}
-
-        if "readonly" in lines:
-            options["readonly"] = True
-            lines.remove("readonly")
-
-        elif "ro" in lines:
-            options["readonly"] = True
-            lines.remove("ro")
-
-        tokens = line.split(",")
-
-        for token in tokens:
-            if mount_id := re.search(r"id=(.*)", token):
-                options["id"] = re.sub(r"id=", "", mount_id.group(0))
-
-            elif target := re.search(r"target=(.*)", token):
-                options["target"] = re.sub(r"target=", "", target.group(0))
-
-            elif source := re.search(r"source=(.*)", token):
-                options["source"] = re.sub(r"source=", "", source.group(0))
+        return cls.parse_options(parse_key_values(line))
 
-            elif mount_from := re.search(r"from=(.*)", token):
-                options["from_layer"] = re.sub(r"from=", "", mount_from.group(0))
-
-            elif readonly := re.search(r"readonly=(.*)", token):
-                readonly_value = re.sub(r"readonly=", "", readonly.group(0))
-                options["enable_readonly"] = True if readonly_value == "true" else None
-
-            elif re.search(r"readonly", token) or re.search(r"ro", token):
-                options["enable_readonly"] = True
-
-            elif readwrite := re.search(r"readwrite=(.*)", token):
-                readwrite_value = re.sub(r"readwrite=", "", readwrite.group(0))
-                options["enable_readwrite"] = (
-                    True if readwrite_value == "true" else None
-                )
-
-            elif re.search(r"readwrite", token) or re.search(r"rw", token):
-                options["enable_readwrite"] = True
-
-            elif sharing := re.search(r"sharing=(shared|private|locked)", token):
-                options["sharing"] = re.search(
-                    r"shared|private|locked", sharing.group(0)
-                ).group(0)
-
-            elif mode := re.search(r"mode=[0-7]{4}|[0-7]{3}", token):
-                options["mode"] = re.sub(r"mode=", "", mode.group(0))
+    @classmethod
+    def parse_options(cls, mount_options: List[Tuple[str, Optional[str]]]):
+        options: CacheMountConfig = {"mount_type": "cache"}
 
-            elif uid := re.search(r"uid=[0-7]{4}|[0-7]{3}", token):
-                options["user_id"] = re.sub(r"uid=", "", uid.group(0))
+        for key, value in mount_options:
+            if option := _cache_mount_options.get(key):
+                options[option] = value
 
-            elif gid := re.search(r"gid=[0-7]{4}|[0-7]{3}", token):
-                options["group_id"] = re.sub(r"gid=", "", gid.group(0))
+            elif flag := _cache_mount_flags.get(key):
+                options[flag] = parse_bool(value)
 
         return CacheMount(**options)
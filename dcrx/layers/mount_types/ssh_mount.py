@@ -1,8 +1,9 @@
-import re
-from typing import Dict, Literal
+from typing import Dict, List, Literal, Optional, Tuple
 
 from pydantic import BaseModel, StrictBool, StrictStr, constr
 
+from ..tokenizer import parse_bool, parse_key_values
+
 SSHMountConfig = Dict[
     Literal[
         "id",
@@ -15,6 +16,19 @@ SSHMountConfig = Dict[
     Literal["ssh"] | str | bool | Literal[r"^[0-7]*$"],
 ]
 
+_ssh_mount_options: Dict[str, str] = {
+    "id": "id",
+    "target": "target",
+    "dst": "target",
+    "mode": "mode",
+    "uid": "user_id",
+    "gid": "group_id",
+}
+
+_ssh_mount_flags: Dict[str, str] = {
+    "required": "required",
+}
+
 
 class SSHMount(BaseModel):
     mount_type: Literal["ssh"] = "ssh"
@@ -26,53 +40,42 @@ class SSHMount(BaseModel):
     group_id: StrictStr | None = None
 
     def to_string(self) -> str:
-        mount_string = f"--mount=type={self.mount_type}"
+        mount_options = [f"--mount=type={self.mount_type}"]
 
         if self.id:
-            mount_string = f"{mount_string},id={self.id}"
+            mount_options.append(f"id={self.id}")
 
         if self.target:
-            mount_string = f"{mount_string},target={self.target}"
+            mount_options.append(f"target={self.target}")
 
         if self.required is not None:
             required = "true" if self.required else False
-            mount_string = f"{mount_string},required={required}"
+            mount_options.append(f"required={required}")
 
         if self.mode:
-            mount_string = f"{mount_string},mode={self.mode}"
+            mount_options.append(f"mode={self.mode}")
 
         if self.user_id:
-            mount_string = f"{mount_string},uid={self.user_id}"
+            mount_options.append(f"uid={self.user_id}")
 
         if self.group_id:
-            mount_string = f"{mount_string},gid={self.group_id}"
+            mount_options.append(f"gid={self.group_id}")
 
-        return mount_string
+        return ",".join(mount_options)
 
     @classmethod
     def parse(cls, line: str):
-        options: SSHMountConfig = {"mount_type": "ssh"}
-
-        tokens = line.split(",")
+        return cls.parse_options(parse_key_values(line))
 
-        for token in tokens:
-            if mount_id := re.search(r"id=(.*)", token):
-                options["id"] = re.sub(r"id=", "", mount_id.group(0))
-
-            elif target := re.search(r"target=(.*)", token):
-                options["target"] = re.sub(r"target=", "", target.group(0))
-
-            elif required := re.search(r"required=(.*)", token):
-                required_value = re.sub(r"required=", "", required.group(0))
-                options["required"] = True if required_value == "true" else None
-
-            elif mode := re.search(r"mode=[0-7]{4}|[0-7]{3}", token):
-                options["mode"] = re.sub(r"mode=", "", mode.group(0))
+    @classmethod
+    def parse_options(cls, mount_options: List[Tuple[str, Optional[str]]]):
+        options: SSHMountConfig = {"mount_type": "ssh"}
 
-            elif uid := re.search(r"uid=[0-7]{4}|[0-7]{3}", token):
-                options["user_id"] = re.sub(r"uid=", "", uid.group(0))
+        for key, value in mount_options:
+            if option := _ssh_mount_options.get(key):
+                options[option] = value
 
-            elif gid := re.search(r"gid=[0-7]{4}|[0-7]{3}", token):
-                options["group_id"] = re.sub(r"gid=", "", gid.group(0))
+            elif flag := _ssh_mount_flags.get(key):
+                options[flag] = parse_bool(value)
 
         return SSHMount(**options)
@@ -1,8 +1,11 @@
+import math
 import re
-from typing import Dict, Literal
+from typing import Dict, List, Literal, Optional, Tuple
 
 from pydantic import BaseModel, StrictBool, StrictInt, StrictStr, constr
 
+from ..tokenizer import parse_bool, parse_key_values
+
 TMPFSMountConfig = Dict[
     Literal[
         "enable_readonly",
@@ -30,6 +33,49 @@ TMPFSMountConfig = Dict[
     Literal["tmpfs"] | str | bool | Literal[r"^[0-7]*$"] | int,
 ]
 
+_tmpfs_mount_options: Dict[str, str] = {
+    "target": "target",
+    "dst": "target",
+    "destination": "target",
+    "mode": "mode",
+    "uid": "user_id",
+    "gid": "group_id",
+}
+
+_tmpfs_mount_flags: Dict[str, str] = {
+    "readonly": "enable_readonly",
+    "ro": "enable_readonly",
+    "readwrite": "enable_readwrite",
+    "rw": "enable_readwrite",
+    "nosuid": "enable_nosuid",
+    "suid": "enable_suid",
+    "nodev": "enabled_nodev",
+    "dev": "enabled_dev",
+    "exec": "enable_exec",
+    "sync": "enable_sync",
+    "async": "enable_async",
+    "dirsync": "enable_dirsync",
+    "atime": "enable_atime",
+    "noatime": "enable_noatime",
+    "diratime": "enable_diratime",
+    "nodiratime": "enable_nodiratime",
+}
+
+_tmpfs_mount_counts: Dict[str, str] = {
+    "nr_inodes": "number_inodes",
+    "nr_blocks": "number_blocks",
+}
+
+_size_pattern = re.compile(r"([0-9]*\.?[0-9]+)([kKmMgGtT]?)[bB]?$")
+
+_size_units: Dict[str, int] = {
+    "": 1,
+    "k": 1024,
+    "m": 1024**2,
+    "g": 1024**3,
+    "t": 1024**4,
+}
+
 
 class TMPFSMount(BaseModel):
     mount_type: Literal["tmpfs"] = "tmpfs"
@@ -56,160 +102,98 @@ class TMPFSMount(BaseModel):
     number_blocks: StrictInt | None = None
 
     def to_string(self) -> str:
-        mount_string = f"--mount=type={self.mount_type},target={self.target}"
+        mount_options = [f"--mount=type={self.mount_type}", f"target={self.target}"]
 
         if self.enable_readonly:
-            mount_string = f"{mount_string},ro"
+            mount_options.append("ro")
 
         if self.enable_readwrite:
-            mount_string = f"{mount_string},rw"
+            mount_options.append("rw")
 
         if self.enable_nosuid:
-            mount_string = f"{mount_string},nosuid"
+            mount_options.append("nosuid")
 
         if self.enable_suid:
-            mount_string = f"{mount_string},suid"
+            mount_options.append("suid")
 
         if self.enabled_nodev:
-            mount_string = f"{mount_string},nodev"
+            mount_options.append("nodev")
 
         if self.enabled_dev:
-            mount_string = f"{mount_string},dev"
+            mount_options.append("dev")
 
         if self.enable_exec:
-            mount_string = f"{mount_string},exec"
+            mount_options.append("exec")
 
         if self.enable_sync:
-            mount_string = f"{mount_string},sync"
+            mount_options.append("sync")
 
         if self.enable_async:
-            mount_string = f"{mount_string},async"
+            mount_options.append("async")
 
         if self.enable_dirsync:
-            mount_string = f"{mount_string},dirsync"
+            mount_options.append("dirsync")
 
         if self.enable_atime:
-            mount_string = f"{mount_string},atime"
+            mount_options.append("atime")
 
         if self.enable_noatime:
-            mount_string = f"{mount_string},noatime"
+            mount_options.append("noatime")
 
         if self.enable_diratime:
-            mount_string = f"{mount_string},diratime"
+            mount_options.append("diratime")
 
         if self.enable_nodiratime:
-            mount_string = f"{mount_string},nodiratime"
+            mount_options.append("nodiratime")
 
         if self.mode:
-            mount_string = f"{mount_string},mode={self.mode}"
+            mount_options.append(f"mode={self.mode}")
 
         if self.user_id:
-            mount_string = f"{mount_string},uid={self.user_id}"
+            mount_options.append(f"uid={self.user_id}")
 
         if self.group_id:
-            mount_string = f"{mount_string},gid={self.group_id}"
+            mount_options.append(f"gid={self.group_id}")
 
         if self.number_inodes:
-            mount_string = f"{mount_string},nr_inodes={self.number_inodes}"
+            mount_options.append(f"nr_inodes={self.number_inodes}")
 
         if self.number_blocks:
-            mount_string = f"{mount_string},nr_blocks={self.number_blocks}"
+            mount_options.append(f"nr_blocks={self.number_blocks}")
 
         if self.size:
-            mount_string = f"{mount_string},size={self.size}m"
+            mount_options.append(f"size={self.size}m")
 
-        return mount_string
+        return ",".join(mount_options)
 
     @classmethod
     def parse(cls, line: str):
-        options: TMPFSMountConfig = {"mount_type": "tmpfs"}
-
-        tokens = line.split(",")
-
-        for token in tokens:
-            if target := re.search(r"target=(.*)", token):
-                options["target"] = re.sub(r"target=", "", target.group(0))
-
-            elif size := re.search(r"size=[0-9]{*}", token):
-                options["size"] = cls._match_size(size.group(0))
-
-            elif readonly := re.search(r"readonly=(.*)", token):
-                readonly_value = re.sub(r"readonly=", "", readonly.group(0))
-                options["enable_readonly"] = True if readonly_value == "true" else None
-
-            elif re.search(r"readonly", token) or re.search(r"ro", token):
-                options["enable_readonly"] = True
-
-            elif readwrite := re.search(r"readwrite=(.*)", token):
-                readwrite_value = re.sub(r"readwrite=", "", readwrite.group(0))
-                options["enable_readwrite"] = (
-                    True if readwrite_value == "true" else None
-                )
-
-            elif re.search(r"readwrite", token) or re.search(r"rw", token):
-                options["enable_readwrite"] = True
-
-            elif re.search(r"nosuid", token):
-                options["enable_nosuid"] = True
-
-            elif re.search(r"suid", token):
-                options["enable_suid"] = True
-
-            elif re.search(r"nodev", token):
-                options["enable_nodev"] = True
+        return cls.parse_options(parse_key_values(line))
 
-            elif re.search(r"dev", token):
-                options["enable_dev"] = True
-
-            elif re.search(r"exec", token):
-                options["enable_exec"] = True
-
-            elif re.search(r"async", token):
-                options["enable_async"] = True
-
-            elif re.search(r"dirsync", token):
-                options["enable_dirsync"] = True
-
-            elif re.search(r"sync", token):
-                options["enable_sync"] = True
-
-            if re.search(r"atime", token):
-                options["enable_atime"] = True
-
-            elif re.search(r"noatime", token):
-                options["enable_noatime"] = True
-
-            elif re.search(r"diratime", token):
-                options["enable_diratime"] = True
-
-            elif re.search(r"nodiratime", token):
-                options["enable_nodiratime"] = True
-
-            elif mode := re.search(r"mode=[0-7]{4}|[0-7]{3}", token):
-                options["mode"] = re.sub(r"mode=", "", mode.group(0))
-
-            elif uid := re.search(r"uid=[0-7]{4}|[0-7]{3}", token):
-                options["user_id"] = re.sub(r"uid=", "", uid.group(0))
+    @classmethod
+    def parse_options(cls, mount_options: List[Tuple[str, Optional[str]]]):
+        options: TMPFSMountConfig = {"mount_type": "tmpfs"}
 
-            elif gid := re.search(r"gid=[0-7]{4}|[0-7]{3}", token):
-                options["group_id"] = re.sub(r"gid=", "", gid.group(0))
+        for key, value in mount_options:
+            if option := _tmpfs_mount_options.get(key):
+                options[option] = value
 
-            elif size := re.search(r"size=\d+", token):
-                options["group_id"] = int(re.sub(r"size=", "", size.group(0)))
+            elif flag := _tmpfs_mount_flags.get(key):
+                options[flag] = parse_bool(value)
 
-            elif number_inodes := re.search(r"nr_inodes=\d+", token):
-                options["number_inodes"] = int(
-                    re.sub(r"nr_inodes=", "", number_inodes.group(0))
-                )
+            elif key == "size" and value:
+                options["size"] = cls._match_size(value)
 
-            elif number_blocks := re.search(r"nr_blocks=\d+", token):
-                options["number_blocks"] = int(
-                    re.sub(r"nr_blocks=", "", number_blocks.group(0))
-                )
+            elif key in ("nr_inodes", "nr_blocks") and value and value.isdigit():
+                options[_tmpfs_mount_counts[key]] = int(value)
 
         return TMPFSMount(**options)
 
     @classmethod
     def _match_size(cls, token: str):
-        if size := re.search(r"[0-9]{*}", token):
-            return int(size.group(0))
+        # Sizes are stored in megabytes. Unsuffixed sizes are bytes.
+        if size := _size_pattern.match(token):
+            amount, unit = size.groups()
+            size_bytes = float(amount) * _size_units[unit.lower()]
+
+            return max(1, math.ceil(size_bytes / _size_units["m"]))
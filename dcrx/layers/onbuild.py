@@ -1,4 +1,3 @@
-import re
 from pydantic import (
     BaseModel
 )
@@ -18,6 +17,59 @@ from .stopsignal import StopSignal
 from .user import User
 from .volume import Volume
 from .workdir import Workdir
+from .tokenizer import split_keyword, strip_keyword
+
+
+_onbuild_directives: Dict[
+    Literal[
+        'ADD',
+        'ARG',
+        'CMD',
+        'COPY',
+        'ENTRYPOINT',
+        'ENV',
+        'EXPOSE',
+        'HEALTHCHECK',
+        'LABEL',
+        'RUN',
+        'SHELL',
+        'STOPSIGNAL',
+        'USER',
+        'VOLUME',
+        'WORKDIR'
+    ],
+    Add |
+    Arg |
+    Cmd |
+    Copy |
+    Entrypoint |
+    Env |
+    Expose |
+    Healthcheck |
+    Label |
+    Run |
+    Shell |
+    StopSignal |
+    User |
+    Volume | 
+    Workdir
+] = {
+    'ADD': Add,
+    'ARG': Arg,
+    'CMD': Cmd,
+    'COPY': Copy,
+    'ENTRYPOINT': Entrypoint,
+    'ENV': Env,
+    'EXPOSE': Expose,
+    'HEALTHCHECK': Healthcheck,
+    'LABEL': Label,
+    'RUN': Run,
+    'SHELL': Shell,
+    'STOPSIGNAL': StopSignal,
+    'USER': User,
+    'VOLUME': Volume,
+    'WORKDIR': Workdir
+}
 
 
 class OnBuild(BaseModel):
@@ -47,98 +99,15 @@ class OnBuild(BaseModel):
         instruction_command = self.instruction.to_string()
         return f'ONBUILD {instruction_command}'
     
+    @classmethod
     def parse(
         cls,
         line: str
     ):
-        line = re.sub('ONBUILD ', '', line, count=1).strip()
-
-        directives: Dict[
-            Literal[
-                'ADD',
-                'ARG',
-                'CMD',
-                'COPY',
-                'ENTRYPOINT',
-                'ENV',
-                'EXPOSE',
-                'FROM',
-                'HEALTHCHECK',
-                'LABEL',
-                'MAINTAINER',
-                'ONBUILD',
-                'RUN',
-                'SHELL',
-                'STOPSIGNAL',
-                'USER',
-                'VOLUME',
-                'WORKDIR'
-            ],
-            Add |
-            Arg |
-            Cmd |
-            Copy |
-            Entrypoint |
-            Env |
-            Expose |
-            Healthcheck |
-            Label |
-            OnBuild |
-            Run |
-            Shell |
-            StopSignal |
-            User |
-            Volume | 
-            Workdir
-        ] = {
-            'ADD': Add,
-            'ARG': Arg,
-            'CMD': Cmd,
-            'COPY': Copy,
-            'ENTRYPOINT': Entrypoint,
-            'ENV': Env,
-            'EXPOSE': Expose,
-            'HEALTHCHECK': Healthcheck,
-            'LABEL': Label,
-            'ONBUILD': OnBuild,
-            'RUN': Run,
-            'SHELL': Shell,
-            'STOPSIGNAL': StopSignal,
-            'USER': User,
-            'VOLUME': Volume,
-            'WORKDIR': Workdir
-        }
-        
-        if directive_type := re.search(
-            r'ADD|ARG|CMD|COPY|ENTRYPOINT|ENV|EXPOSE|HEALTHCHECK|LABEL|RUN|SHELL|STOPSIGNAL|USER|VOLUME|WORKDIR',
-            line
-        ):
-            directive_name: Literal[
-                'ADD',
-                'ARG',
-                'CMD',
-                'COPY',
-                'ENTRYPOINT',
-                'ENV',
-                'EXPOSE',
-                'FROM',
-                'HEALTHCHECK',
-                'LABEL',
-                'MAINTAINER',
-                'ONBUILD',
-                'RUN',
-                'SHELL',
-                'STOPSIGNAL',
-                'USER',
-                'VOLUME',
-                'WORKDIR'
-            ] = directive_type.group(0) 
-            directive = directives[directive_name]
-
-            token = re.sub(f'${directive_name} ', '', line, count=1)
-
-            return directive.parse(token)
-
-
+        instruction_line = strip_keyword(line, 'ONBUILD')
+        directive_name, _ = split_keyword(instruction_line)
 
-        
\ No newline at end of file
+        if directive := _onbuild_directives.get(directive_name):
+            return OnBuild(
+                instruction=directive.parse(instruction_line)
+            )
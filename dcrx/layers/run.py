@@ -1,6 +1,5 @@
-import re
 from pydantic import BaseModel, StrictStr
-from typing import Optional, Literal, Union, Dict
+from typing import Optional, Literal, List, Union, Dict
 from .mount_types import (
     BindMount,
     CacheMount,
@@ -8,6 +7,33 @@ from .mount_types import (
     SSHMount,
     TMPFSMount
 )
+from .tokenizer import (
+    parse_flags,
+    parse_key_values,
+    strip_keyword
+)
+
+
+_mount_types: Dict[
+    Literal[
+        'bind',
+        'cache',
+        'secret',
+        'ssh',
+        'tmpfs'
+    ],
+    BindMount |
+    CacheMount |
+    SecretMount |
+    SSHMount |
+    TMPFSMount
+] = {
+    'bind': BindMount,
+    'cache': CacheMount,
+    'secret': SecretMount,
+    'ssh': SSHMount,
+    'tmpfs': TMPFSMount
+}
 
 
 class Run(BaseModel):
@@ -18,7 +44,14 @@ class Run(BaseModel):
         CacheMount |
         SecretMount |
         SSHMount |
-        TMPFSMount
+        TMPFSMount |
+        List[
+            BindMount |
+            CacheMount |
+            SecretMount |
+            SSHMount |
+            TMPFSMount
+        ]
     ]=None
     network: Optional[
         Literal[
@@ -36,19 +69,25 @@ class Run(BaseModel):
 
     def to_string(self) -> str:
 
-        run_string = 'RUN'
+        run_args = ['RUN']
+
+        if isinstance(self.mount, (list, tuple)):
+            run_args.extend([
+                mount.to_string() for mount in self.mount
+            ])
 
-        if self.mount:
-            mount_string = self.mount.to_string()
-            run_string = f'{run_string} {mount_string}'
+        elif self.mount:
+            run_args.append(self.mount.to_string())
 
         if self.network:
-            run_string = f'{run_string} --network={self.network}'
+            run_args.append(f'--network={self.network}')
 
         if self.security:
-            run_string = f'{run_string} --security={self.security}'
+            run_args.append(f'--security={self.security}')
 
-        return f'{run_string} {self.command}'
+        run_args.append(self.command)
+
+        return ' '.join(run_args)
     
     @classmethod
     def parse(
@@ -56,62 +95,33 @@ class Run(BaseModel):
         line: str
     ):
         
-        line = re.sub('RUN ', '', line, count=1)
-        tokens = line.strip('\n').split(' ')
+        flags, command = parse_flags(
+            strip_keyword(line, 'RUN'),
+            repeated=('mount',)
+        )
 
         options: Dict[str, str | bool | int] = {}
-        remainders = []
-
-        for token in tokens:
-
-            if mount := re.search(
-                r'--mount=(.*)',
-                token
-            ):
-                
-                mount_token = re.sub(
-                    r'--mount=',
-                    '',
-                    mount.group(0)
-                )
-
-                options['mount'] = cls._parse_mount(mount_token)
-                line = re.sub(
-                    mount.group(0),
-                    '',
-                    line
-                )
-
-            elif network := re.search(
-                r'--network=(.*)',
-                token
-            ):
-                options['network'] = cls._parse_network(
-                    network.group(0)
-                )
-
-                line = re.sub(
-                    network.group(0),
-                    '',
-                    line
-                )
-
-            elif security := re.search(
-                r'--security=(.*)',
-                token
-            ):
-                options['security'] = cls._parse_security(
-                    security.group(0)
-                )
-
-                line = re.sub(
-                    security.group(0),
-                    '',
-                    line
-                )
+
+        mounts = [
+            cls._parse_mount(mount) for mount in flags.get('mount', []) if mount
+        ]
+
+        # A single mount keeps the single-mount shape, and repeated
+        # --mount flags are all kept, in order.
+        if len(mounts) == 1:
+            options['mount'] = mounts[0]
+
+        elif mounts:
+            options['mount'] = mounts
+
+        if network := flags.get('network'):
+            options['network'] = cls._parse_network(network)
+
+        if security := flags.get('security'):
+            options['security'] = cls._parse_security(security)
 
         return Run(
-            command=line,
+            command=command,
             **options
         )
 
@@ -120,58 +130,22 @@ class Run(BaseModel):
         cls,
         token: str
     ):
+        mount_options = parse_key_values(token)
         mount_type = 'bind'
 
-        mount_types: Dict[
-            Literal[
-                'bind',
-                'cache',
-                'secret',
-                'ssh',
-                'tmpfs'
-            ],
-            BindMount |
-            CacheMount |
-            SecretMount |
-            SSHMount |
-            TMPFSMount
-        ] = {
-            'bind': BindMount,
-            'cache': CacheMount,
-            'secret': SecretMount,
-            'ssh': SSHMount,
-            'tmpfs': TMPFSMount
-        }
-
-
-        if mount_match := re.search(
-            r'type=(bind|cache|secret|ssh|tmpfs)',
-            token
-        ):
-            mount_type = re.sub(
-                r'type=',
-                '',
-                mount_match.group(0)
-            )
-
-            token = re.sub(
-                r'type=(bind|cache|secret|ssh|tmpfs)',
-                '',
-                token
-            )
-
-        return mount_types[mount_type].parse(token)
+        for key, value in mount_options:
+            if key == 'type' and value in _mount_types:
+                mount_type = value
+
+        return _mount_types[mount_type].parse_options(mount_options)
     
     @classmethod
     def _parse_network(
         cls,
         token: str
     ) -> Literal['default', 'host', 'none']:
-        if network := re.search(
-            r'default|host|none',
-            token
-        ):
-            return network.group(0)
+        if token in ('default', 'host', 'none'):
+            return token
         
         return 'none'
     
@@ -180,13 +154,7 @@ class Run(BaseModel):
         cls,
         token: str
     ) -> Literal['insecure', 'sandbox']:
-        if security := re.search(
-            r'insecure|sandbox',
-            token
-        ):
-            return security.group(0)
+        if token in ('insecure', 'sandbox'):
+            return token
         
         return 'insecure'
-
-        
-        
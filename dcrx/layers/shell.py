@@ -1,4 +1,4 @@
-import re
+import json
 from pydantic import (
     BaseModel,
     StrictStr,
@@ -7,6 +7,11 @@ from pydantic import (
     StrictFloat
 )
 from typing import List, Optional, Literal
+from .tokenizer import (
+    parse_json_array,
+    strip_keyword,
+    unquote
+)
 
 
 class Shell(BaseModel):
@@ -32,9 +37,9 @@ class Shell(BaseModel):
                 ) else str(parameter) for parameter in self.parameters
             ])
 
-        shell_command = f', '.join(shell_command_args)
+        shell_command = json.dumps(list(shell_command_args))
 
-        return f'SHELL [ {shell_command} ]'
+        return f'SHELL {shell_command}'
     
     @classmethod
     def parse(
@@ -42,14 +47,13 @@ class Shell(BaseModel):
         line: str
     ):
         
-        line = re.sub('SHELL ', '', line, count=1)
-        command = [
-            arg.strip() for arg in re.sub(
-                r'\[|\]', 
-                '', 
-                line
-            ).split(',')
-        ]
+        args = strip_keyword(line, 'SHELL')
+
+        command = parse_json_array(args)
+        if command is None:
+            command = [
+                unquote(arg.strip()) for arg in args.strip('[]').split(',')
+            ]
 
         parameters: List[str|int|bool|float] | None = None
         if len(command) > 1:
@@ -58,4 +62,4 @@ class Shell(BaseModel):
         return Shell(
             executable=command[0],
             parameters=parameters
-        )
\ No newline at end of file
+        )
@@ -1,8 +1,9 @@
-import re
 from typing import Dict, Literal, Optional
 
 from pydantic import BaseModel, StrictStr
 
+from .tokenizer import parse_flags, strip_keyword
+
 
 class Stage(BaseModel):
     layer_type: Literal["stage"] = "stage"
@@ -15,7 +16,7 @@ class Stage(BaseModel):
         from_args = ["FROM"]
 
         if self.platform:
-            from_args.append(self.platform)
+            from_args.append(f"--platform={self.platform}")
 
         if self.tag:
             from_args.append(f"{self.base}:{self.tag}")
@@ -30,31 +31,30 @@ class Stage(BaseModel):
 
     @classmethod
     def parse(cls, line: str):
-        line = re.sub("FROM ", "", line, count=1).strip()
-        templated_alias_pattern = re.compile(r" as (.*)| AS (.*)")
-        templated_platform_pattern = re.compile(r"--platform=([^\s]+)")
+        flags, args = parse_flags(strip_keyword(line, "FROM"))
+        tokens = args.split()
 
         options: Dict[str, str] = {}
 
-        if platform_match := re.search(templated_platform_pattern, line):
-            options["platform"] = re.sub("--platform=", "", platform_match.group(0))
-
-            line = re.sub(templated_platform_pattern, "", line)
+        if platform := flags.get("platform"):
+            options["platform"] = platform
 
-        if ":" in line:
-            base, tag = line.split(":")
+        if len(tokens) > 2 and tokens[1].upper() == "AS":
+            options["alias"] = tokens[2]
 
-        else:
-            base = line
-            tag = "latest"
+        image = tokens[0]
+        tag: str | None = "latest"
 
-        if alias := re.search(templated_alias_pattern, line):
-            options["alias"] = re.sub(r" as | AS ", "", alias.group(0))
-            base = re.sub(templated_alias_pattern, "", base)
+        # A ":" only separates the tag when it comes after the last "/",
+        # otherwise it is a registry port. Digests are kept on the base.
+        if "@" in image:
+            base = image
+            tag = None
 
-        if alias := re.search(templated_alias_pattern, tag):
-            options["alias"] = re.sub(r" as | AS ", "", alias.group(0))
+        elif ":" in image.rsplit("/", 1)[-1]:
+            base, tag = image.rsplit(":", 1)
 
-            tag = re.sub(templated_alias_pattern, "", tag)
+        else:
+            base = image
 
         return Stage(base=base, tag=tag, **options)
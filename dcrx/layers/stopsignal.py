@@ -1,9 +1,10 @@
-import re
+import signal
 from pydantic import (
     BaseModel,
     StrictInt
 )
 from typing import Literal
+from .tokenizer import strip_keyword
 
 
 class StopSignal(BaseModel):
@@ -19,13 +20,19 @@ class StopSignal(BaseModel):
         line: str
     ):
         
-        line = re.sub('STOPSIGNAL ', '', line, count=1).strip()
-        return StopSignal(
-            signal=int(
-                re.sub(
-                    r'[^0-9]',
-                    '',
-                    line
-                )
+        token = strip_keyword(line, 'STOPSIGNAL').upper()
+
+        if token.isdigit():
+            return StopSignal(
+                signal=int(token)
             )
-        )
\ No newline at end of file
+
+        if not token.startswith('SIG'):
+            token = f'SIG{token}'
+
+        if token not in signal.Signals.__members__:
+            raise ValueError(f'Unknown stop signal {token}')
+
+        return StopSignal(
+            signal=signal.Signals[token].value
+        )
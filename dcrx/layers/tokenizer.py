@@ -0,0 +1,136 @@
+import json
+import re
+from typing import Dict, List, Optional, Tuple
+
+# Every layer and mount type tokenizes its instruction through these
+# patterns, which are compiled once at import rather than per parse() call.
+_keyword_pattern = re.compile(r"\s*([A-Za-z]+)(?:\s+|$)")
+
+_flag_pattern = re.compile(
+    r"\s*--([A-Za-z][\w-]*)"
+    r"(?:=((?:\"(?:\\.|[^\"\\])*\"|'[^']*'|[^\s\"'])*))?"
+    r"(?=\s|$)"
+)
+
+_token_pattern = re.compile(r"(?:\"(?:\\.|[^\"\\])*\"|'[^']*'|\\\s|[^\s\"'])+")
+
+_key_value_pattern = re.compile(
+    r"\s*([^=,\s]+)\s*(?:=((?:\"(?:\\.|[^\"\\])*\"|[^,])*))?\s*(?:,|$)"
+)
+
+_escaped_quote_pattern = re.compile(r"\\([\"\\])")
+
+_escaped_space_pattern = re.compile(r"\\(\s)")
+
+
+def split_keyword(line: str) -> Tuple[str, str]:
+    if match := _keyword_pattern.match(line):
+        return match.group(1).upper(), line[match.end() :].strip()
+
+    return "", line.strip()
+
+
+def strip_keyword(line: str, keyword: str) -> str:
+    if (match := _keyword_pattern.match(line)) and match.group(1).upper() == keyword:
+        return line[match.end() :].strip()
+
+    return line.strip()
+
+
+def unquote(value: str) -> str:
+    if len(value) > 1 and value[0] == value[-1] and value[0] in "\"'":
+        if value[0] == '"':
+            return _escaped_quote_pattern.sub(r"\1", value[1:-1])
+
+        return value[1:-1]
+
+    return _escaped_space_pattern.sub(r"\1", value)
+
+
+def quote(value: str) -> str:
+    """
+    Inverse of ``unquote`` for values holding whitespace or quotes, so a
+    list of values can be joined into one string and tokenized back.
+    """
+    if value and not any(char.isspace() or char in "\"'" for char in value):
+        return value
+
+    escaped = value.replace("\\", "\\\\").replace('"', '\\"')
+
+    return f'"{escaped}"'
+
+
+def parse_flags(
+    args: str,
+    repeated: Tuple[str, ...] = (),
+) -> Tuple[Dict[str, Optional[str] | List[Optional[str]]], str]:
+    """
+    Consumes the leading ``--flag`` / ``--flag=value`` tokens of an
+    instruction's arguments. Returns the flags (``None`` for bare flags,
+    last value wins for repeats, except for flags named in ``repeated``,
+    which collect every value into a list) and the untouched remainder.
+    """
+    flags: Dict[str, Optional[str] | List[Optional[str]]] = {}
+    position = 0
+
+    while flag := _flag_pattern.match(args, position):
+        name = flag.group(1).lower()
+        value = flag.group(2)
+
+        if value is not None:
+            value = unquote(value)
+
+        if name in repeated:
+            flags.setdefault(name, []).append(value)
+
+        else:
+            flags[name] = value
+
+        position = flag.end()
+
+    return flags, args[position:].strip()
+
+
+def tokenize(args: str) -> List[str]:
+    return [unquote(token) for token in _token_pattern.findall(args)]
+
+
+def parse_key_values(spec: str) -> List[Tuple[str, Optional[str]]]:
+    """
+    Splits a ``key=value,key,key=value`` spec (as used by ``--mount``)
+    into ``(key, value)`` pairs, with ``None`` values for bare keys.
+    """
+    pairs: List[Tuple[str, Optional[str]]] = []
+
+    for pair in _key_value_pattern.finditer(spec):
+        key, value = pair.group(1, 2)
+
+        if value is not None:
+            value = unquote(value.strip())
+
+        pairs.append((key.lower(), value))
+
+    return pairs
+
+
+def parse_json_array(args: str) -> Optional[List[str]]:
+    if not args.startswith("["):
+        return None
+
+    try:
+        values = json.loads(args)
+
+    except ValueError:
+        return None
+
+    if isinstance(values, list):
+        return values
+
+    return None
+
+
+def parse_bool(value: Optional[str]) -> Optional[bool]:
+    if value is None or value.lower() in ("true", "1"):
+        return True
+
+    return None
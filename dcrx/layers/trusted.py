@@ -0,0 +1,145 @@
+from typing import Any, Dict, Type, TypeVar
+
+from pydantic import BaseModel
+
+from .add import Add
+from .arg import Arg
+from .cmd import Cmd
+from .copy import Copy
+from .entrypoint import Entrypoint
+from .env import Env
+from .expose import Expose
+from .healthcheck import Healthcheck
+from .label import Label
+from .maintainer import Maintainer
+from .mount_types import (
+    BindMount,
+    CacheMount,
+    SecretMount,
+    SSHMount,
+    TMPFSMount,
+)
+from .onbuild import OnBuild
+from .run import Run
+from .shell import Shell
+from .stage import Stage
+from .stopsignal import StopSignal
+from .user import User
+from .volume import Volume
+from .workdir import Workdir
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+_layer_types: Dict[str, Type[BaseModel]] = {
+    "add": Add,
+    "arg": Arg,
+    "cmd": Cmd,
+    "copy": Copy,
+    "entrypoint": Entrypoint,
+    "env": Env,
+    "expose": Expose,
+    "healthcheck": Healthcheck,
+    "label": Label,
+    "maintainer": Maintainer,
+    "onbuild": OnBuild,
+    "run": Run,
+    "shell": Shell,
+    "stage": Stage,
+    "stopsignal": StopSignal,
+    "user": User,
+    "volume": Volume,
+    "workdir": Workdir,
+}
+
+_mount_types: Dict[str, Type[BaseModel]] = {
+    "bind": BindMount,
+    "cache": CacheMount,
+    "secret": SecretMount,
+    "ssh": SSHMount,
+    "tmpfs": TMPFSMount,
+}
+
+_model_defaults: Dict[Type[BaseModel], Dict[str, Any]] = {}
+
+_object_setattr = object.__setattr__
+
+
+def _get_defaults(model: Type[BaseModel]) -> Dict[str, Any]:
+    if (defaults := _model_defaults.get(model)) is None:
+        defaults = {
+            name: field.get_default(call_default_factory=True)
+            for name, field in model.model_fields.items()
+            if not field.is_required()
+        }
+
+        _model_defaults[model] = defaults
+
+    return defaults
+
+
+def construct(model: Type[ModelT], fields: Dict[str, Any]) -> ModelT:
+    """
+    Builds ``model`` from field values the library has already validated
+    (parser output, cached layers, resolved copies) without running
+    pydantic validation. Unlike ``model_construct`` this skips per-field
+    default handling beyond a precomputed defaults merge, so it must never
+    be handed unvalidated user input.
+    """
+    instance = model.__new__(model)
+
+    _object_setattr(instance, "__dict__", {**_get_defaults(model), **fields})
+    _object_setattr(instance, "__pydantic_fields_set__", set(fields))
+    _object_setattr(instance, "__pydantic_extra__", None)
+    _object_setattr(instance, "__pydantic_private__", None)
+
+    return instance
+
+
+def replace(layer: ModelT, updates: Dict[str, Any]) -> ModelT:
+    """
+    Returns a shallow copy of ``layer`` with ``updates`` applied, without
+    re-validating either the existing or the updated fields.
+    """
+    if len(updates) < 1:
+        return layer
+
+    instance = layer.__class__.__new__(layer.__class__)
+
+    _object_setattr(instance, "__dict__", {**layer.__dict__, **updates})
+    _object_setattr(
+        instance,
+        "__pydantic_fields_set__",
+        layer.__pydantic_fields_set__.union(updates),
+    )
+    _object_setattr(instance, "__pydantic_extra__", None)
+    _object_setattr(instance, "__pydantic_private__", None)
+
+    return instance
+
+
+def construct_layer(data: Dict[str, Any]):
+    """
+    Rebuilds a layer (or mount) from the output of ``model_dump()``,
+    recursing into nested mounts, healthcheck commands and ONBUILD
+    instructions, without re-validation.
+    """
+    if layer_type := data.get("layer_type"):
+        model = _layer_types[layer_type]
+
+    else:
+        model = _mount_types[data["mount_type"]]
+
+    fields = {name: _construct_value(value) for name, value in data.items()}
+
+    return construct(model, fields)
+
+
+def _construct_value(value: Any) -> Any:
+    if isinstance(value, dict) and ("layer_type" in value or "mount_type" in value):
+        return construct_layer(value)
+
+    if isinstance(value, list):
+        return [_construct_value(item) for item in value]
+
+    return value
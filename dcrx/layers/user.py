@@ -1,10 +1,10 @@
-import re
 from pydantic import (
     BaseModel,
     StrictStr
 )
 
 from typing import Optional, Literal
+from .tokenizer import strip_keyword
 
 
 class User(BaseModel):
@@ -23,14 +23,9 @@ class User(BaseModel):
         cls,
         line: str
     ):
-        line = re.sub(
-            'USER ', 
-            '', 
-            line,
-            count=1
-        ).strip()
-
-        user_id, group_id = cls._match_permissions(line)
+        user_id, group_id = cls._match_permissions(
+            strip_keyword(line, 'USER')
+        )
 
         return User(
             user_id=user_id,
@@ -42,17 +37,9 @@ class User(BaseModel):
         cls,
         token: str
     ):
+        user_id, _, group_id = token.partition(':')
 
-        if ':' in token:
-            user_id, group_id = token.split(':')
-
-            return (
-                user_id,
-                group_id
-            )
-        
-        else:
-            return (
-                token,
-                None
-            )
\ No newline at end of file
+        return (
+            user_id,
+            group_id or None
+        )
@@ -1,10 +1,15 @@
-import re
+import json
 from pydantic import (
     BaseModel,
     StrictStr,
     conlist
 )
 from typing import Literal
+from .tokenizer import (
+    parse_json_array,
+    strip_keyword,
+    tokenize
+)
 
 
 class Volume(BaseModel):
@@ -12,24 +17,26 @@ class Volume(BaseModel):
     paths: conlist(StrictStr, min_length=1)
 
     def to_string(self):
-        paths = ', '.join(self.paths)
+        paths = json.dumps(list(self.paths))
 
-        return f'VOLUME [{paths}]'
+        return f'VOLUME {paths}'
     
     @classmethod
     def parse(
         cls,
         line: str
     ):
-        line = re.sub('VOLUME ', '', line, count=1).strip()
-        paths = [
-            arg.strip() for arg in re.sub(
-                r'\[|\]', 
-                '', 
-                line
-            ).split(',')
-        ]
+        args = strip_keyword(line, 'VOLUME')
+
+        paths = parse_json_array(args)
+        if paths is None and args.startswith('['):
+            paths = [
+                arg.strip() for arg in args.strip('[]').split(',')
+            ]
+
+        elif paths is None:
+            paths = tokenize(args)
 
         return Volume(
             paths=paths
-        )
\ No newline at end of file
+        )
@@ -1,9 +1,9 @@
-import re
 from pydantic import (
     BaseModel,
     StrictStr
 )
 from typing import Literal
+from .tokenizer import strip_keyword
 
 class Workdir(BaseModel):
     layer_type: Literal["workdir"]="workdir"
@@ -18,7 +18,6 @@ class Workdir(BaseModel):
         line: str
     ):
         
-        line = re.sub('WORKDIR ', '', line, count=1).strip()
         return Workdir(
-            path=line
-        )
\ No newline at end of file
+            path=strip_keyword(line, 'WORKDIR')
+        )
@@ -1 +1,3 @@
-from .memory_file import MemoryFile
\ No newline at end of file
+from .memfd_file import MemfdFile
+from .memory_file import MemoryFile
+from .spooled_memory_file import SpooledMemoryFile
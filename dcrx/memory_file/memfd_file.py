@@ -0,0 +1,33 @@
+import io
+import os
+
+
+class MemfdFile(io.FileIO):
+    """
+    An anonymous, memory-backed file created with ``memfd_create``. Unlike
+    MemoryFile it owns a real file descriptor, so consumers can ``fstat``,
+    ``mmap``, or ``os.sendfile`` its contents without first copying them
+    into Python bytes. Linux only - check ``is_supported()`` first.
+    """
+
+    def __init__(self, name: str = "dcrx-context") -> None:
+        super().__init__(
+            os.memfd_create(name, os.MFD_CLOEXEC),
+            mode="w+b",
+            closefd=True,
+        )
+
+        self.label = name
+
+    @staticmethod
+    def is_supported() -> bool:
+        if not hasattr(os, "memfd_create"):
+            return False
+
+        try:
+            os.close(os.memfd_create("dcrx-probe", os.MFD_CLOEXEC))
+
+        except OSError:
+            return False
+
+        return True
@@ -0,0 +1,32 @@
+import tempfile
+from typing import Optional, Union
+
+
+class SpooledMemoryFile(tempfile.SpooledTemporaryFile):
+    """
+    A MemoryFile alternative that stays in memory until it grows past
+    ``max_size`` bytes, then transparently moves its contents to an
+    unlinked temporary file. Calling ``fileno()`` spills the buffer early
+    so consumers like ``os.fstat`` and ``os.sendfile`` always receive a
+    real file descriptor.
+    """
+
+    def __init__(
+        self,
+        initial_bytes: Union[bytes, bytearray] = b"",
+        max_size: int = 32 * 1024 * 1024,
+        directory: Optional[str] = None,
+    ) -> None:
+        super().__init__(
+            max_size=max_size,
+            mode="w+b",
+            dir=directory,
+        )
+
+        if initial_bytes:
+            self.write(initial_bytes)
+            self.seek(0)
+
+    @property
+    def spilled(self) -> bool:
+        return self._rolled
@@ -1,4 +1,7 @@
 from __future__ import annotations
+import functools
+import itertools
+from collections import defaultdict
 from dcrx.layers import (
     Add,
     Arg,
@@ -19,14 +22,111 @@ from dcrx.layers import (
     Volume,
     Workdir
 )
-from typing import List, Any, Tuple
+from dcrx.compact import CompactLayer
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple
+)
+
+
+_missing = object()
+
+
+@functools.lru_cache(maxsize=1024)
+def attribute_getter(path: str) -> Callable[[Any], Any]:
+    """
+    Compiles a dotted attribute path, such as ``mount.target``, into a
+    getter. Missing attributes resolve to None, and lists met along the
+    path are mapped over so ``keys`` or ``mount.target`` work on list
+    fields too.
+    """
+    parts = path.split(".")
+
+    def get(value: Any) -> Any:
+        for part in parts:
+            if value is None:
+                return None
+
+            if isinstance(value, (list, tuple)):
+                value = [
+                    getattr(item, part, None) for item in value
+                ]
+
+            else:
+                value = getattr(value, part, None)
+
+        return value
+
+    return get
+
+
+def matches(layer_value: Any, value: Any) -> bool:
+    if isinstance(layer_value, (list, tuple)):
+        return value in layer_value or layer_value == value
+
+    if hasattr(layer_value, "model_dump") and not hasattr(value, "model_dump"):
+        layer_value = layer_value.model_dump()
+
+    if isinstance(layer_value, dict):
+        try:
+            return value in layer_value or value in layer_value.values()
+
+        except TypeError:
+            return value in layer_value.values()
+
+    return layer_value == value
+
+
+def match_keys(layer_value: Any) -> List[Hashable]:
+    """
+    Returns every value that ``matches`` would accept for ``layer_value``,
+    raising TypeError if any of them cannot be hashed into an index.
+    """
+    if isinstance(layer_value, (list, tuple)):
+        keys = list(layer_value)
+
+        if isinstance(layer_value, tuple):
+            keys.append(layer_value)
+
+    elif hasattr(layer_value, "model_dump"):
+        # Like matches(), a model is found by an equal model as well as by
+        # any of its dumped keys or values.
+        dumped = layer_value.model_dump()
+        keys = [layer_value, *dumped.keys(), *dumped.values()]
+
+    elif isinstance(layer_value, dict):
+        keys = [*layer_value.keys(), *layer_value.values()]
+
+    else:
+        keys = [layer_value]
+
+    for key in keys:
+        hash(key)
+
+    return keys
 
 
 class LayerQuery:
+    """
+    A lazy pipeline over layers. ``where``, ``select`` and ``limit`` chain
+    steps without materializing intermediate lists, and ``results``,
+    ``count``, ``exists``, ``one`` and ``group_by`` evaluate them. Attribute
+    paths are read directly from layers. A query over a list snapshots it
+    when created. Equality lookups on a snapshot of compact (immutable)
+    layers build a hash index once an attribute is looked up twice, after
+    which they cost only the size of their result.
+    """
 
     def __init__(
         self,
-        layers: List[
+        layers: Iterable[
             Add |
             Arg |
             Cmd |
@@ -43,15 +143,45 @@ class LayerQuery:
             Stage |
             StopSignal |
             User |
-            Volume | 
-            Workdir
-        ]
+            Volume |
+            Workdir |
+            CompactLayer
+        ],
+        step: Optional[Callable[[Iterator[Any]], Iterator[Any]]] = None,
     ) -> None:
+        if isinstance(layers, list):
+            layers = tuple(layers)
+
         self._layers = layers
+        self._step = step
+
+        self._indexable: Optional[bool] = None
+        self._indexes: Dict[str, Optional[Dict[Hashable, List[int]]]] = {}
+        self._lookups: Dict[str, int] = defaultdict(int)
 
     def __iter__(self):
-        for layer in self._layers:
-            yield layer
+        if self._step is None:
+            return iter(self._layers)
+
+        return self._step(iter(self._layers))
+
+    def where(
+        self,
+        attribute: str | Callable[[Any], bool],
+        value: Any = _missing,
+    ) -> LayerQuery:
+        """
+        Filters by a predicate, or by an attribute path holding (or, for
+        list and mapping attributes, containing) ``value``.
+        """
+        if callable(attribute):
+            predicate = attribute
+            return LayerQuery(self, lambda layers: filter(predicate, layers))
+
+        if value is _missing:
+            raise ValueError(f"No value given to match attribute {attribute}")
+
+        return self.get((attribute, value))
 
     def get(
         self,
@@ -62,56 +192,153 @@ class LayerQuery:
             ]
         )
     ) -> LayerQuery:
-        layers: (
-            List[
-                Add |
-                Arg |
-                Cmd |
-                Copy |
-                Entrypoint |
-                Env |
-                Expose |
-                Healthcheck |
-                Label |
-                Maintainer |
-                OnBuild |
-                Run |
-                Shell |
-                Stage |
-                StopSignal |
-                User |
-                Volume | 
-                Workdir
-            ]
-        ) = []
-
+        """
+        Filters to layers matching any of the ``(attribute, value)`` pairs,
+        yielding each matching layer once.
+        """
         if not isinstance(attributes, list):
             attributes = [attributes]
 
-        for layer in self._layers:
-            layer_dict = layer.model_dump()
+        positions = self._lookup(attributes)
+        if positions is not None:
+            layers = self._layers
+            return LayerQuery([layers[position] for position in positions])
 
-            for attribute, value in attributes:
-                layer_attribute = layer_dict.get(attribute)
+        getters = [
+            (attribute_getter(attribute), value) for attribute, value in attributes
+        ]
+
+        def step(layers: Iterator[Any]) -> Iterator[Any]:
+            for layer in layers:
+                if any(matches(get(layer), value) for get, value in getters):
+                    yield layer
+
+        return LayerQuery(self, step)
+
+    def select(self, *attributes: str) -> LayerQuery:
+        """
+        Projects each layer to one attribute's value, or to a tuple of
+        values when several attribute paths are given.
+        """
+        getters = [attribute_getter(attribute) for attribute in attributes]
+
+        if len(getters) == 1:
+            get = getters[0]
+            return LayerQuery(self, lambda layers: map(get, layers))
+
+        return LayerQuery(
+            self,
+            lambda layers: (tuple(get(layer) for get in getters) for layer in layers),
+        )
+
+    def limit(self, count: int) -> LayerQuery:
+        return LayerQuery(self, lambda layers: itertools.islice(layers, count))
+
+    def count(self) -> int:
+        return sum(1 for _ in self)
+
+    def exists(self) -> bool:
+        return next(iter(self), _missing) is not _missing
+
+    def group_by(self, attribute: str) -> Dict[Any, List[Any]]:
+        get = attribute_getter(attribute)
+        groups: Dict[Any, List[Any]] = defaultdict(list)
+
+        for layer in self:
+            key = get(layer)
+
+            if isinstance(key, list):
+                key = tuple(key)
+
+            groups[key].append(layer)
+
+        return dict(groups)
+
+    def index(self, attribute: str) -> Optional[Dict[Hashable, List[int]]]:
+        """
+        Returns (building if needed) the hash index of ``attribute`` over
+        this query's source, mapping each matchable value to layer
+        positions, or None if the source is not a snapshot of compact
+        layers or holds values that cannot be hashed.
+        """
+        if not self._is_indexable():
+            return None
+
+        if attribute in self._indexes:
+            return self._indexes[attribute]
+
+        get = attribute_getter(attribute)
+        index = defaultdict(list)
 
-                if isinstance(layer_attribute, list) and value in layer_attribute:
-                    layers.append(layer)
-                
-                elif (
-                    isinstance(layer_attribute, dict) and (
-                        value in layer_attribute or value in list(layer_attribute.values()))
-                    ):
-                    layers.append(layer)
+        try:
+            for position, layer in enumerate(self._layers):
+                for key in set(match_keys(get(layer))):
+                    index[key].append(position)
 
-                elif layer_attribute == value:
-                    layers.append(layer)
+        except TypeError:
+            index = None
+
+        self._indexes[attribute] = index
+
+        return index
 
-        return LayerQuery(layers)
-    
     def results(self):
-        return self._layers
-    
+        return list(self)
+
     def one(self):
-        if len(self._layers) > 0:
-            return self._layers.pop()
-        
+        layer = None
+        for layer in self:
+            pass
+
+        return layer
+
+    def _lookup(
+        self,
+        attributes: List[Tuple[str, Any]],
+    ) -> Optional[List[int]]:
+        if not self._is_indexable():
+            return None
+
+        indexes: List[Tuple[Dict[Hashable, List[int]], Any]] = []
+
+        for attribute, value in attributes:
+            self._lookups[attribute] += 1
+
+            if self._lookups[attribute] < 2 and attribute not in self._indexes:
+                return None
+
+            try:
+                hash(value)
+
+            except TypeError:
+                return None
+
+            if (index := self.index(attribute)) is None:
+                return None
+
+            indexes.append((index, value))
+
+        if len(indexes) == 1:
+            index, value = indexes[0]
+            return index.get(value, [])
+
+        return sorted(
+            set(
+                itertools.chain.from_iterable(
+                    index.get(value, ()) for index, value in indexes
+                )
+            )
+        )
+
+    def _is_indexable(self) -> bool:
+        # Pydantic layers can be mutated in place without the query
+        # noticing, so only snapshots of immutable compact layers are
+        # indexed.
+        if self._indexable is None:
+            self._indexable = (
+                self._step is None
+                and isinstance(self._layers, tuple)
+                and all(isinstance(layer, CompactLayer) for layer in self._layers)
+            )
+
+        return self._indexable
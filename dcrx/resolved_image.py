@@ -0,0 +1,113 @@
+from __future__ import annotations
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .queries import LayerQuery
+
+
+class ResolvedImage:
+    """
+    A lazy, read-only view of an Image with its ARG/ENV variables
+    substituted. Variables are resolved once, on first access, and each
+    layer is resolved the first time it is read and then cached. The view
+    reflects the Image's layers as of that first access, so mutating the
+    Image afterwards requires a new view.
+    """
+
+    def __init__(
+        self,
+        image: Any,
+        defaults: Dict[str, str] = {},
+        skip: List[str] = [],
+    ) -> None:
+        self.image = image
+        self.defaults = dict(defaults)
+        self.skip = list(skip)
+
+        self._variables: Optional[
+            Tuple[List[Dict[str, Any]], List[int], Dict[int, List[Optional[str]]]]
+        ] = None
+        self._resolved: Dict[int, Any] = {}
+
+    def __len__(self) -> int:
+        return len(self.image._layers)
+
+    def __iter__(self) -> Iterator[Any]:
+        for position in range(len(self.image._layers)):
+            yield self._resolve(position)
+
+    def __getitem__(self, position: int | slice):
+        if isinstance(position, slice):
+            return [
+                self._resolve(idx)
+                for idx in range(*position.indices(len(self.image._layers)))
+            ]
+
+        if position < 0:
+            position += len(self.image._layers)
+
+        if not 0 <= position < len(self.image._layers):
+            raise IndexError(f"Layer {position} is out of range")
+
+        return self._resolve(position)
+
+    @property
+    def scopes(self) -> List[Dict[str, Any]]:
+        scopes, _, _ = self._resolve_variables()
+
+        return scopes
+
+    def layers(self, layer_types: Optional[str | List[str]] = None) -> LayerQuery:
+        """
+        Queries the resolved layers, only resolving those of the requested
+        types.
+        """
+        if layer_types is None:
+            return LayerQuery(self)
+
+        if not isinstance(layer_types, list):
+            layer_types = [layer_types]
+
+        layer_index = self.image._layer_index
+
+        return LayerQuery([
+            self._resolve(position)
+            for layer_type in layer_types
+            for position in layer_index.get(layer_type, ())
+        ])
+
+    def iter_lines(self) -> Iterator[str]:
+        separator = ""
+
+        for layer in self:
+            if separator:
+                yield separator
+
+            yield layer.to_string().strip("\n")
+            separator = "\n\n"
+
+    def to_string(self) -> str:
+        return "".join(self.iter_lines())
+
+    def _resolve(self, position: int):
+        if (layer := self._resolved.get(position)) is None:
+            scopes, layer_scopes, layer_values = self._resolve_variables()
+
+            layer = self.image._resolve_layer_at(
+                position,
+                scopes,
+                layer_scopes,
+                layer_values,
+                self.skip,
+            )
+
+            self._resolved[position] = layer
+
+        return layer
+
+    def _resolve_variables(
+        self,
+    ) -> Tuple[List[Dict[str, Any]], List[int], Dict[int, List[Optional[str]]]]:
+        if self._variables is None:
+            self._variables = self.image._resolve_variables(self.defaults, self.skip)
+
+        return self._variables
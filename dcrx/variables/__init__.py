@@ -0,0 +1,5 @@
+from .scope import Definition as Definition
+from .scope import resolve_definitions as resolve_definitions
+from .template import Template as Template
+from .template import Variable as Variable
+from .template import compile_template as compile_template
@@ -0,0 +1,112 @@
+from typing import Any, Collection, Dict, List, Literal, Mapping, Optional, Tuple
+
+from .template import compile_template
+
+
+class Definition:
+    """
+    One ARG or ENV assignment within a scope. ``value`` is the raw,
+    possibly templated value, or None for an ARG declared without a
+    default. Definitions sharing an ``instruction`` (the keys of one ENV
+    line) do not see each other's values; None gives a definition an
+    instruction of its own.
+    """
+
+    __slots__ = ("kind", "name", "value", "instruction")
+
+    def __init__(
+        self,
+        kind: Literal["arg", "env"],
+        name: str,
+        value: Optional[str],
+        instruction: Optional[int] = None,
+    ) -> None:
+        self.kind = kind
+        self.name = name
+        self.value = value
+        self.instruction = instruction
+
+    def __repr__(self) -> str:
+        return f"Definition({self.kind}, {self.name}={self.value!r})"
+
+
+def resolve_definitions(
+    definitions: List[Definition],
+    inherited: Mapping[str, Any] = {},
+    globals: Mapping[str, Any] = {},
+    overrides: Mapping[str, Any] = {},
+    skip: Collection[str] = (),
+) -> Tuple[List[Optional[str]], Dict[str, Any]]:
+    """
+    Resolves a scope's ARG/ENV definitions in order, computing each value
+    exactly once.
+
+    As in the builder, a reference resolves to the name's latest
+    definition from an earlier instruction, or else to its inherited
+    value, so definitions only ever depend on values already computed.
+    ``inherited`` holds values visible before the scope (such as a parent
+    stage's ENV), ``globals`` the values an ARG declared without a default
+    takes on, and ``overrides`` build-arg values replacing ARG defaults.
+    Names in ``skip`` are never substituted, so references to them keep
+    their source text, and they are left out of the final mapping.
+
+    Returns the resolved value of every definition, in order, and the
+    scope's final name to value mapping.
+    """
+    values: List[Optional[str]] = []
+
+    # Latest definition of each name from an earlier instruction, and the
+    # definitions of the instruction being resolved.
+    visible: Dict[str, int] = {}
+    pending: Dict[str, int] = {}
+    instruction: Optional[int] = None
+
+    for idx, definition in enumerate(definitions):
+        if definition.instruction is None or definition.instruction != instruction:
+            visible.update(pending)
+            pending = {}
+            instruction = definition.instruction
+
+        previous = visible.get(definition.name)
+
+        if _is_overridden(definition, overrides):
+            value = overrides[definition.name]
+
+        elif definition.value is None:
+            value = globals.get(definition.name) if previous is None else values[previous]
+
+        else:
+            template = compile_template(definition.value)
+            scope: Dict[str, Any] = {}
+
+            for name in template.variables:
+                if name in skip:
+                    continue
+
+                dependency = visible.get(name)
+                scope[name] = inherited.get(name) if dependency is None else values[dependency]
+
+            value = template.render(scope)
+
+        values.append(value)
+        pending[definition.name] = idx
+
+    visible.update(pending)
+
+    resolved: Dict[str, Any] = dict(inherited)
+
+    for name, value in overrides.items():
+        if name not in visible:
+            resolved[name] = value
+
+    for name, idx in visible.items():
+        resolved[name] = values[idx]
+
+    for name in skip:
+        resolved.pop(name, None)
+
+    return values, resolved
+
+
+def _is_overridden(definition: Definition, overrides: Mapping[str, Any]) -> bool:
+    return definition.kind == "arg" and overrides.get(definition.name) is not None
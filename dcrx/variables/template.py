@@ -0,0 +1,198 @@
+import functools
+import re
+from typing import Any, FrozenSet, List, Mapping, Optional, Tuple
+
+_name_pattern = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+
+# Longest operators first so ":-" is not read as a bare ":".
+_operators = (":-", ":+", ":?", "-", "+", "?")
+
+
+class Variable:
+    """
+    One ``$NAME`` or ``${NAME<operator>word}`` reference in a template,
+    keeping its source text so unknown variables render unchanged.
+    """
+
+    __slots__ = ("name", "operator", "word", "source")
+
+    def __init__(
+        self,
+        name: str,
+        source: str,
+        operator: Optional[str] = None,
+        word: Optional["Template"] = None,
+    ) -> None:
+        self.name = name
+        self.source = source
+        self.operator = operator
+        self.word = word
+
+    def __repr__(self) -> str:
+        return f"Variable({self.source!r})"
+
+    def render(self, values: Mapping[str, Any]) -> str:
+        value = values.get(self.name)
+
+        # Values dcrx cannot know - build args without defaults, variables
+        # from base images - are left for the builder to expand.
+        if value is None:
+            return self.source
+
+        value = str(value)
+        operator = self.operator
+
+        if operator is None or operator == "-":
+            return value
+
+        if operator == ":-":
+            return value if value else self.word.render(values)
+
+        if operator == ":+":
+            return self.word.render(values) if value else ""
+
+        if operator == "+":
+            return self.word.render(values)
+
+        if operator == ":?" and not value:
+            message = self.word.render(values) or "is not allowed to be empty"
+            raise ValueError(f"{self.name}: {message}")
+
+        return value
+
+
+class Template:
+    """
+    A string compiled once into literal and Variable segments, following
+    the BuildKit word grammar: ``$NAME``, ``${NAME}``, ``${NAME:-word}``,
+    ``${NAME-word}``, ``${NAME:+word}``, ``${NAME+word}``, ``${NAME:?word}``
+    and ``${NAME?word}``, where ``word`` may hold further variables.
+    Backslash-escaped characters are literal. Quotes are not special,
+    since layer fields have already been unquoted by parsing and an
+    apostrophe in a value (``Bob's app``) must not hide later variables.
+    Rendering is a single linear pass over the segments.
+    """
+
+    __slots__ = ("source", "segments", "variables")
+
+    def __init__(
+        self,
+        source: str,
+        segments: Tuple[str | Variable, ...],
+    ) -> None:
+        self.source = source
+        self.segments = segments
+
+        names = set()
+        for segment in segments:
+            if isinstance(segment, Variable):
+                names.add(segment.name)
+
+                if segment.word is not None:
+                    names.update(segment.word.variables)
+
+        self.variables: FrozenSet[str] = frozenset(names)
+
+    def __repr__(self) -> str:
+        return f"Template({self.source!r})"
+
+    def render(self, values: Mapping[str, Any]) -> str:
+        if not self.variables:
+            return self.source
+
+        return "".join(
+            segment if isinstance(segment, str) else segment.render(values)
+            for segment in self.segments
+        )
+
+
+@functools.lru_cache(maxsize=65536)
+def compile_template(source: str) -> Template:
+    segments, _ = _parse(source, 0, nested=False)
+    return Template(source, segments)
+
+
+def _parse(
+    source: str,
+    position: int,
+    nested: bool,
+) -> Tuple[Tuple[str | Variable, ...], int]:
+    """
+    Parses segments from ``position`` until the end of ``source`` or, for
+    a nested word, the ``}`` closing it. Returns the segments and the
+    position reached (of the closing brace, when nested).
+    """
+    segments: List[str | Variable] = []
+    literal: List[str] = []
+    length = len(source)
+
+    while position < length:
+        char = source[position]
+
+        if nested and char == "}":
+            break
+
+        if char == "\\":
+            literal.append(source[position : position + 2])
+            position += 2
+            continue
+
+        if char == "$":
+            variable, end = _parse_variable(source, position)
+
+            if variable is not None:
+                if literal:
+                    segments.append("".join(literal))
+                    literal = []
+
+                segments.append(variable)
+                position = end
+                continue
+
+        literal.append(char)
+        position += 1
+
+    if literal:
+        segments.append("".join(literal))
+
+    return tuple(segments), position
+
+
+def _parse_variable(
+    source: str,
+    position: int,
+) -> Tuple[Optional[Variable], int]:
+    if source.startswith("${", position):
+        name_match = _name_pattern.match(source, position + 2)
+        if name_match is None:
+            return None, position
+
+        name = name_match.group(0)
+        cursor = name_match.end()
+
+        if source.startswith("}", cursor):
+            return Variable(name, source[position : cursor + 1]), cursor + 1
+
+        for operator in _operators:
+            if source.startswith(operator, cursor):
+                word_start = cursor + len(operator)
+                word_segments, end = _parse(source, word_start, nested=True)
+
+                # Unterminated expressions are kept as literal text.
+                if end >= len(source):
+                    return None, position
+
+                word = Template(source[word_start:end], word_segments)
+                return (
+                    Variable(name, source[position : end + 1], operator, word),
+                    end + 1,
+                )
+
+        return None, position
+
+    name_match = _name_pattern.match(source, position + 1)
+    if name_match is None:
+        return None, position
+
+    name = name_match.group(0)
+    return Variable(name, f"${name}"), name_match.end()
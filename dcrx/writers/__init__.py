@@ -0,0 +1 @@
+from .atomic_writer import AtomicWriter as AtomicWriter
@@ -0,0 +1,122 @@
+import hashlib
+import os
+import tempfile
+import threading
+from typing import Optional, Set
+
+
+class AtomicWriter:
+    """
+    Writes files only when their content changes, going through a temp
+    file and rename so readers never observe a partial file. Unchanged
+    files are left untouched, preserving their mtime for downstream file
+    watchers. With ``batch`` enabled, directory fsyncs are deferred until
+    ``sync()`` so writing many files syncs each directory once.
+    """
+
+    def __init__(
+        self,
+        batch: bool = False,
+        chunk_size: int = 65536,
+    ) -> None:
+        self.batch = batch
+        self.chunk_size = chunk_size
+
+        self._pending_directories: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.sync()
+
+    def digest(self, filepath: str) -> Optional[bytes]:
+        hasher = hashlib.blake2b()
+
+        try:
+            with open(filepath, "rb") as existing:
+                for chunk in iter(lambda: existing.read(self.chunk_size), b""):
+                    hasher.update(chunk)
+
+        except (FileNotFoundError, IsADirectoryError):
+            return None
+
+        return hasher.digest()
+
+    def is_changed(self, filepath: str, data: bytes) -> bool:
+        try:
+            if os.stat(filepath).st_size != len(data):
+                return True
+
+        except FileNotFoundError:
+            return True
+
+        return self.digest(filepath) != hashlib.blake2b(data).digest()
+
+    def write(self, filepath: str, data: bytes) -> bool:
+        if not self.is_changed(filepath, data):
+            return False
+
+        directory = os.path.dirname(os.path.abspath(filepath))
+        file_fd, tmp_path = tempfile.mkstemp(
+            dir=directory,
+            prefix=f".{os.path.basename(filepath)}.",
+        )
+
+        try:
+            with os.fdopen(file_fd, "wb") as output:
+                output.write(data)
+                output.flush()
+                os.fsync(output.fileno())
+
+            try:
+                os.chmod(tmp_path, os.stat(filepath).st_mode & 0o7777)
+
+            except FileNotFoundError:
+                umask = os.umask(0)
+                os.umask(umask)
+                os.chmod(tmp_path, 0o666 & ~umask)
+
+            os.replace(tmp_path, filepath)
+
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+            raise
+
+        if self.batch:
+            with self._lock:
+                self._pending_directories.add(directory)
+
+        else:
+            self._sync_directory(directory)
+
+        return True
+
+    def sync(self):
+        with self._lock:
+            directories = list(self._pending_directories)
+            self._pending_directories.clear()
+
+        for directory in directories:
+            self._sync_directory(directory)
+
+    def _sync_directory(self, directory: str):
+        # Directories cannot be opened for fsync on every platform
+        # (notably Windows), where the rename is as durable as it gets.
+        try:
+            directory_fd = os.open(directory, os.O_RDONLY)
+
+        except OSError:
+            return
+
+        try:
+            os.fsync(directory_fd)
+
+        except OSError:
+            pass
+
+        finally:
+            os.close(directory_fd)